@@ -0,0 +1,138 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+import time
+
+import serial
+
+# Changing the timeout reconfigures the port, so only a few levels are used
+TIMEOUT_LEVELS = (0.002, 0.01, 0.05, 0.1)
+# Each read tries to gather about this much data before returning
+TARGET_BATCH_TIME = 0.01
+# The data rate is measured over windows of this length, so that a burst
+# arriving within a single read does not look like a fast link
+RATE_WINDOW = 0.2
+# Weight of the newest window in the data rate estimate
+RATE_SMOOTHING = 0.5
+STATS_INTERVAL = 1.0
+# An unterminated line is returned as it is once nothing has arrived for
+# this long (e.g. a prompt, or a device ending lines with CR only) ...
+PARTIAL_LINE_TIMEOUT = 0.1
+# ... or once it grows this long, e.g. binary data without any newline
+MAX_LINE_LENGTH = 64 * 1024
+
+
+@dataclass
+class ReadStats:
+    chunk_size: int
+    timeout: float
+    port_calls_per_second: float
+    bytes_per_second: float
+
+
+def bits_per_frame(port: serial.Serial) -> float:
+    """Start bit, data bits, parity and stop bits of one character."""
+    parity = 0 if port.parity == serial.PARITY_NONE else 1
+    return 1 + port.bytesize + parity + port.stopbits
+
+
+class AdaptiveReader:
+    """
+    Reads from a pyserial port in chunks sized from the observed data rate.
+
+    The chunk is about TARGET_BATCH_TIME worth of data at the current rate,
+    bounded by what the baud rate allows, and never less than what is
+    already waiting. The blocking timeout follows the time needed to fill
+    a chunk, so a busy 4 Mbaud link makes few large reads while an idle or
+    slow one wakes up at most ten times a second and returns every byte
+    as soon as it arrives.
+
+    Lines are split here instead of with readline, which reads byte by byte.
+    """
+
+    def __init__(self, port: serial.Serial) -> None:
+        self._port = port
+        self._rate = 0.0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._partial = b""
+        self._last_data = time.monotonic()
+        self._lines: deque[bytes] = deque()
+
+        self._stats_start = time.monotonic()
+        self._stats_calls = 0
+        self._stats_bytes = 0
+
+        self.chunk_size = 1
+        self._set_timeout(TIMEOUT_LEVELS[-1])
+        self._stats = ReadStats(self.chunk_size, self.timeout, 0.0, 0.0)
+
+    def max_bytes_per_second(self) -> float:
+        return self._port.baudrate / bits_per_frame(self._port)
+
+    def read_chunk(self) -> bytes:
+        waiting = self._port.in_waiting
+        data = self._port.read(max(self.chunk_size, waiting))
+        self._stats_calls += 2
+        self._stats_bytes += len(data)
+        self._update(len(data))
+        return data
+
+    def read_line(self) -> bytes:
+        """
+        Return one complete line, or b"" if none arrived within the timeout.
+        An unterminated line is returned without a newline after
+        PARTIAL_LINE_TIMEOUT of silence or once it reaches MAX_LINE_LENGTH.
+        """
+        if not self._lines:
+            data = self.read_chunk()
+            now = time.monotonic()
+            if data:
+                self._last_data = now
+                *lines, self._partial = (self._partial + data).split(b"\n")
+                self._lines.extend(line + b"\n" for line in lines)
+            if self._partial and (
+                len(self._partial) >= MAX_LINE_LENGTH
+                or not data and now - self._last_data >= PARTIAL_LINE_TIMEOUT
+            ):
+                self._lines.append(self._partial)
+                self._partial = b""
+        return self._lines.popleft() if self._lines else b""
+
+    def _update(self, received: int) -> None:
+        now = time.monotonic()
+        self._window_bytes += received
+        elapsed = now - self._window_start
+        if elapsed < RATE_WINDOW:
+            return
+        self._rate += RATE_SMOOTHING * (self._window_bytes / elapsed - self._rate)
+        self._window_start = now
+        self._window_bytes = 0
+
+        max_chunk = max(1, int(self.max_bytes_per_second() * TARGET_BATCH_TIME))
+        self.chunk_size = min(max_chunk, max(1, int(self._rate * TARGET_BATCH_TIME)))
+
+        # A single byte read returns as soon as the byte arrives
+        fill_time = TIMEOUT_LEVELS[-1] if self.chunk_size == 1 else self.chunk_size / self._rate
+        level = next((t for t in TIMEOUT_LEVELS if t >= fill_time), TIMEOUT_LEVELS[-1])
+        if level != self.timeout:
+            self._set_timeout(level)
+
+        if now - self._stats_start >= STATS_INTERVAL:
+            self._stats = ReadStats(
+                chunk_size=self.chunk_size,
+                timeout=self.timeout,
+                port_calls_per_second=self._stats_calls / (now - self._stats_start),
+                bytes_per_second=self._stats_bytes / (now - self._stats_start),
+            )
+            self._stats_start = now
+            self._stats_calls = 0
+            self._stats_bytes = 0
+
+    def _set_timeout(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._port.timeout = timeout
+        self._stats_calls += 1
+
+    def stats(self) -> ReadStats:
+        return self._stats
@@ -0,0 +1,110 @@
+"""
+Compares the old receive pipeline (decode every read to str, then parse
+the str) with the bytes pipeline (parse the bytes, decode text for the
+text view once per batch). Both update the text view every --batch lines.
+
+Reports time per line, peak traced memory and the memory blocks each
+pipeline holds just before a text view update, counted with tracemalloc.
+
+What to expect: json.loads decodes bytes internally, so both pipelines
+decode every line once to parse it and the bytes pipeline is not faster
+per line. What it saves is the decoded str of every line waiting for the
+next text view update, it holds the received bytes instead. With
+--batch 1 there is nothing waiting and both hold the same.
+
+    python bench_pipeline.py [--lines N] [--channels N] [--batch N]
+"""
+from typing import Callable
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from serial_port import TextEncoding
+from text_decoder import TextDecoder
+
+REPEATS = 3
+
+# Called with the pending lines right before they go to the text view
+BeforeUpdate = Callable[[list], None]
+
+
+def make_lines(count: int, channels: int) -> list[bytes]:
+    return [
+        json.dumps({f"ch{c}": random.randint(0, 1000) for c in range(channels)}).encode() + b"\n"
+        for _ in range(count)
+    ]
+
+
+def str_pipeline(lines: list[bytes], batch: int, before_update: BeforeUpdate) -> None:
+    text = []
+    pending = []
+    for line in lines:
+        data = line.decode(errors="replace")
+        json.loads(data)
+        pending.append(data)
+        if len(pending) >= batch:
+            before_update(pending)
+            text.append("".join(pending))
+            pending.clear()
+    text.append("".join(pending))
+
+
+def bytes_pipeline(lines: list[bytes], batch: int, before_update: BeforeUpdate) -> None:
+    decoder = TextDecoder(TextEncoding.UTF8)
+    text = []
+    pending = []
+    for line in lines:
+        json.loads(line)
+        pending.append(line)
+        if len(pending) >= batch:
+            before_update(pending)
+            text.append(decoder.decode(b"".join(pending)))
+            pending.clear()
+    text.append(decoder.decode(b"".join(pending)))
+
+
+def timed_run(pipeline, lines: list[bytes], batch: int) -> float:
+    start = time.perf_counter()
+    pipeline(lines, batch, lambda pending: None)
+    return time.perf_counter() - start
+
+
+def measure(name: str, pipeline, lines: list[bytes], batch: int) -> None:
+    # Timed without tracing, tracemalloc slows every allocation down
+    elapsed = min(timed_run(pipeline, lines, batch) for _ in range(REPEATS))
+
+    held = []
+
+    def count_blocks(pending: list) -> None:
+        if not held:
+            snapshot = tracemalloc.take_snapshot()
+            held.append(sum(stat.count for stat in snapshot.statistics("filename")))
+
+    # The input lines exist before tracing starts and are not counted
+    tracemalloc.start()
+    pipeline(lines, batch, count_blocks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = held[0] if held else 0
+    print(
+        f"{name:<8} {elapsed * 1e6 / len(lines):8.2f} us/line  peak {peak / 1024:10.1f} KiB"
+        f"  blocks held per update {blocks:6}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=30, help="lines decoded per text view update")
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.channels)
+    measure("str", str_pipeline, lines, args.batch)
+    measure("bytes", bytes_pipeline, lines, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Frame time of the multi-channel plot over channel counts: data preparation
+(redraw) plus painting the plot, rendered offscreen.
+
+    QT_QPA_PLATFORM=offscreen python bench_plot.py [--channels 10 50 200] [--samples 2000]
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from channel_buffer import ChannelBuffer
+from multi_channel_plot import MultiChannelPlot
+
+FRAMES = 10
+
+
+def make_buffer(channels: int, samples: int) -> ChannelBuffer:
+    labels = [f"ch{c}" for c in range(channels)]
+    t = np.arange(samples, dtype=float) / 100
+    values = np.random.default_rng(0).standard_normal((channels, samples)).cumsum(axis=1)
+    return ChannelBuffer.from_arrays(labels, t, values)
+
+
+def frame_times(app: QApplication, plot: MultiChannelPlot) -> tuple[float, float]:
+    prepare, total = [], []
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        plot.request_redraw()
+        plot.redraw()
+        prepared = time.perf_counter()
+        plot.plotWidget.viewport().repaint()
+        app.processEvents()
+        end = time.perf_counter()
+        prepare.append(prepared - start)
+        total.append(end - start)
+    return statistics.median(prepare), statistics.median(total)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--channels", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = QApplication()
+    print(f"{'channels':>8} {'prepare ms':>11} {'frame ms':>9}")
+    for channels in args.channels:
+        plot = MultiChannelPlot(make_buffer(channels, args.samples))
+        plot.resize(1200, 800)
+        plot.show()
+        app.processEvents()
+        prepare, total = frame_times(app, plot)
+        print(f"{channels:8} {prepare * 1000:11.1f} {total * 1000:9.1f}")
+        plot.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load test of the stream server: many local subscribers plus one that never
+reads, fed by a publisher thread standing in for the serial reader.
+Reports delivery latency, lines received per client and the longest
+publish call (which would block the reader).
+
+    python bench_stream.py [--clients 50] [--rate 2000] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from latency import percentile
+from stream_server import StreamServer
+
+
+def publisher(server: StreamServer, rate: float, seconds: float, publish_times: list[float]) -> None:
+    start = time.perf_counter()
+    sent = 0
+    while (now := time.perf_counter()) - start < seconds:
+        due = int((now - start) * rate) - sent
+        for _ in range(due):
+            line = f"{time.perf_counter():.9f}\n".encode()
+            before = time.perf_counter()
+            server.publish(line)
+            publish_times.append(time.perf_counter() - before)
+        sent += max(due, 0)
+        time.sleep(0.001)
+
+
+async def subscriber(path: str, latencies: list[float], counts: list[int], stop: asyncio.Event) -> None:
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(b"raw\n")
+    await writer.drain()
+    received = 0
+    partial = b""
+    while not stop.is_set():
+        try:
+            chunk = await asyncio.wait_for(reader.read(65536), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        if not chunk:
+            break
+        now = time.perf_counter()
+        *lines, partial = (partial + chunk).split(b"\n")
+        latencies.extend(now - float(line) for line in lines)
+        received += len(lines)
+    counts.append(received)
+    writer.close()
+
+
+async def run(args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "stream.sock")
+    server = StreamServer(f"unix:{path}").start()
+
+    # A client that subscribes but never reads
+    _, stalled_writer = await asyncio.open_unix_connection(path)
+    stalled_writer.write(b"raw\n")
+
+    latencies, counts, stop = [], [], asyncio.Event()
+    tasks = [
+        asyncio.create_task(subscriber(path, latencies, counts, stop))
+        for _ in range(args.clients)
+    ]
+    while server.clients() < args.clients + 1:
+        await asyncio.sleep(0.01)
+
+    publish_times = []
+    thread = threading.Thread(target=publisher, args=(server, args.rate, args.seconds, publish_times))
+    thread.start()
+    await asyncio.to_thread(thread.join)
+    await asyncio.sleep(0.5)
+    stop.set()
+    await asyncio.gather(*tasks)
+    stalled_writer.close()
+    server.stop()
+
+    latencies.sort()
+    print(f"{args.clients} clients, {len(publish_times)} lines published")
+    print(f"lines per client: min {min(counts)}, max {max(counts)}")
+    print(
+        f"latency p50 {percentile(latencies, 50) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms"
+    )
+    print(f"longest publish call {max(publish_times) * 1e6:.0f} us")
+    print(f"batches dropped for slow clients {server.dropped_batches()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=2000, help="lines per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput of the whole receive path: a pty VirtualDevice sends lines at
+set rates, they are read by SerialThread through RealSerialPort and
+counted where the GUI would receive them. Reports received lines/s, read()
+calls/s and (with adaptive reads) port calls/s for every rate and reading
+setup.
+
+    python bench_throughput.py [--rates 100 1000 10000 50000] [--seconds 3]
+"""
+from dataclasses import replace
+import argparse
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from serial_port import RealSerialPort, SerialPortSettings, ReadingMode, StandardBaudRates
+from serial_thread import SerialThread
+from virtual_device import VirtualDevice, VirtualDeviceSettings, DevicePattern
+
+SETUPS = {
+    "readline": dict(reading_mode=ReadingMode.READ_LINE, adaptive_reads=False, timeout=0.1),
+    "adaptive line": dict(reading_mode=ReadingMode.READ_LINE, adaptive_reads=True),
+    "adaptive chunk": dict(reading_mode=ReadingMode.READ_BYTE, adaptive_reads=True),
+}
+
+
+class CountingPort(RealSerialPort):
+    """Counts the read() calls SerialThread makes."""
+
+    def __init__(self, port: str, settings: SerialPortSettings) -> None:
+        super().__init__(port, settings)
+        self.reads = 0
+
+    def read(self) -> bytes:
+        self.reads += 1
+        return super().read()
+
+
+def run(app: QCoreApplication, rate: float, settings: SerialPortSettings, seconds: float) -> str:
+    device_settings = VirtualDeviceSettings(pattern=DevicePattern.JSON, rate=rate, channels=4, echo=False)
+    with VirtualDevice(device_settings) as device:
+        ports = []
+
+        def open_port(port_id: str, port_settings: SerialPortSettings) -> CountingPort:
+            ports.append(CountingPort(device.port_name, port_settings))
+            return ports[-1]
+
+        thread = SerialThread(open_port)
+        received = {"lines": 0}
+        stats = []
+        thread.new_data.connect(lambda data: received.__setitem__("lines", received["lines"] + data.count(b"\n")))
+        thread.read_stats.connect(stats.append)
+        thread.open_port("virtual", settings)
+        thread.start()
+
+        # Skip the start-up, adaptive reads need a moment to size the reads
+        start = time.monotonic()
+        while time.monotonic() - start < 1.0:
+            app.processEvents()
+        lines, reads, start = received["lines"], ports[0].reads, time.monotonic()
+        while time.monotonic() - start < seconds:
+            app.processEvents()
+            time.sleep(0.001)
+        elapsed = time.monotonic() - start
+        lines, reads = received["lines"] - lines, ports[0].reads - reads
+
+        thread.shutdown()
+        thread.wait()
+        app.processEvents()
+
+    port_calls = f"{stats[-1].port_calls_per_second:9.0f}" if stats else f"{'-':>9}"
+    return (
+        f"{lines / elapsed:10.0f} {reads / elapsed:10.0f} {port_calls} "
+        f"{device.dropped_lines:8}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=float, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication()
+    base = replace(SerialPortSettings.default(), baudrate=StandardBaudRates.B4000000)
+    print(f"{'setup':15} {'rate':>8} {'lines/s':>10} {'read()/s':>10} {'calls/s':>9} {'dropped':>8}")
+    for name, overrides in SETUPS.items():
+        for rate in args.rates:
+            result = run(app, rate, replace(base, **overrides), args.seconds)
+            print(f"{name:15} {rate:8.0f} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import numpy as np
+
+# Size of one sample value (and of one sample time)
+ITEM_SIZE = np.dtype(np.float64).itemsize
+
+
+class ChannelBuffer:
+    """
+    Samples of all plotted channels kept in a single 2-D block,
+    one row per channel and one column per sample time.
+    Channels that are missing from a sample hold NaN.
+
+    With max_bytes set, the oldest half of the samples is dropped whenever
+    the block would outgrow it, and the block is shrunk whenever a new
+    channel lowers the number of samples that fit.
+
+    A buffer made with from_arrays starts with restored samples that are
+    kept as they are, e.g. memory-mapped, before the appended ones. They
+    are never dropped and do not count towards max_bytes. Read ranges with
+    columns, t and values copy the restored samples into memory.
+    """
+
+    def __init__(self, capacity: int = 1024, max_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.labels: list[str] = []
+        self._rows: dict[str, int] = {}
+        max_samples = self.max_samples()
+        if max_samples is not None:
+            capacity = min(capacity, max_samples)
+        self._t = np.empty(capacity)
+        self._values = np.empty((0, capacity))
+        self._size = 0
+        # Restored samples before the appended ones, see from_arrays
+        self._restored_t = np.empty(0)
+        self._restored_values = np.empty((0, 0))
+
+    @staticmethod
+    def from_arrays(
+        labels: list[str], t: np.ndarray, values: np.ndarray, max_bytes: int | None = None,
+    ) -> ChannelBuffer:
+        """
+        A buffer whose first samples are the existing (e.g. memory-mapped)
+        arrays, which are used without copying.
+        """
+        buffer = ChannelBuffer(capacity=0, max_bytes=max_bytes)
+        buffer.labels = list(labels)
+        buffer._rows = {label: row for row, label in enumerate(labels)}
+        buffer._values = np.empty((len(labels), 0))
+        buffer._restored_t = t
+        buffer._restored_values = values
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self._restored_t) + self._size
+
+    @property
+    def t(self) -> np.ndarray:
+        return self.columns([], 0, len(self))[0]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.columns(range(len(self.labels)), 0, len(self))[1]
+
+    def time_index(self, t: float) -> int:
+        """Index of the first sample at or after time t."""
+        restored = len(self._restored_t)
+        index = int(np.searchsorted(self._restored_t, t))
+        if index < restored:
+            return index
+        return restored + int(np.searchsorted(self._t[:self._size], t))
+
+    def time_at(self, index: int) -> float:
+        restored = len(self._restored_t)
+        if index < restored:
+            return float(self._restored_t[index])
+        return float(self._t[index - restored])
+
+    def columns(self, rows, start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Times and values of the given rows for samples [start, stop).
+        Channels added after restoring hold NaN in the restored samples.
+        """
+        rows = list(rows)
+        restored = len(self._restored_t)
+        if start >= restored:
+            first, last = start - restored, stop - restored
+            return self._t[first:last], self._values[rows, first:last]
+
+        restored_stop = min(stop, restored)
+        t = [self._restored_t[start:restored_stop]]
+        values = np.full((len(rows), stop - start), np.nan)
+        old_rows = [(i, row) for i, row in enumerate(rows) if row < self._restored_values.shape[0]]
+        if old_rows:
+            positions, source_rows = zip(*old_rows)
+            values[list(positions), :restored_stop - start] = (
+                self._restored_values[list(source_rows), start:restored_stop]
+            )
+        if stop > restored:
+            t.append(self._t[:stop - restored])
+            values[:, restored_stop - start:] = self._values[rows, :stop - restored]
+        return np.concatenate(t), values
+
+    def row(self, label: str) -> int:
+        return self._rows[label]
+
+    def add_channel(self, label: str) -> int:
+        self._rows[label] = len(self.labels)
+        self.labels.append(label)
+        max_samples = self.max_samples()
+        # Also when exactly full, the next sample needs a free column
+        if max_samples is not None and self._size >= max_samples:
+            self._drop_oldest(self._size - max_samples // 2)
+        elif max_samples is not None:
+            self._reallocate(min(len(self._t), max_samples))
+        else:
+            self._reallocate(len(self._t))
+        return self._rows[label]
+
+    def nbytes(self) -> int:
+        """Memory taken by the appended samples."""
+        return self._t.nbytes + self._values.nbytes
+
+    def max_samples(self) -> int | None:
+        if self.max_bytes is None:
+            return None
+        bytes_per_sample = ITEM_SIZE * (1 + len(self.labels))
+        return max(2, self.max_bytes // bytes_per_sample)
+
+    def append(self, t: float, sample: dict[str, float]) -> list[str]:
+        """Add one sample, returns the labels of channels seen for the first time."""
+        max_samples = self.max_samples()
+        if max_samples is not None and self._size >= max_samples:
+            self._drop_oldest(self._size - max_samples // 2)
+        if self._size == len(self._t):
+            self._grow()
+
+        new_labels = []
+        for label in sample:
+            if label not in self._rows:
+                self.add_channel(label)
+                new_labels.append(label)
+
+        column = self._size
+        self._t[column] = t
+        self._values[:, column] = np.nan
+        for label, value in sample.items():
+            self._values[self._rows[label], column] = value
+        self._size += 1
+        return new_labels
+
+    def _drop_oldest(self, count: int) -> None:
+        max_samples = self.max_samples()
+        capacity = len(self._t) if max_samples is None else min(len(self._t), max_samples)
+        if capacity < len(self._t) or self._values.shape[0] < len(self.labels):
+            self._reallocate(capacity, first=count)
+            return
+        keep = self._size - count
+        self._t[:keep] = self._t[count:self._size]
+        self._values[:, :keep] = self._values[:, count:self._size]
+        self._size = keep
+
+    def _grow(self) -> None:
+        capacity = max(1024, 2 * len(self._t))
+        max_samples = self.max_samples()
+        if max_samples is not None:
+            capacity = max(min(capacity, max_samples), self._size + 1)
+        self._reallocate(capacity)
+
+    def _reallocate(self, capacity: int, first: int = 0) -> None:
+        """
+        Move samples [first, size) to new arrays of the given capacity,
+        with a row for every label. Rows of new channels hold NaN.
+        """
+        size = self._size - first
+        rows = self._values.shape[0]
+        t = np.empty(capacity)
+        t[:size] = self._t[first:self._size]
+        values = np.empty((len(self.labels), capacity))
+        values[:rows, :size] = self._values[:, first:self._size]
+        values[rows:, :size] = np.nan
+        self._t = t
+        self._values = values
+        self._size = size
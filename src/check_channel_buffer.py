@@ -0,0 +1,109 @@
+"""
+Headless check of ChannelBuffer bounds and of restored sessions: channels
+appear at random while max_bytes keeps dropping samples, and a restored
+block must survive new samples and a save unchanged. Exits with status 1
+on a failure.
+
+    python check_channel_buffer.py [--samples 20000]
+"""
+from dataclasses import dataclass
+import argparse
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+from channel_buffer import ChannelBuffer, ITEM_SIZE
+from serial_port import SerialPortSettings
+from session import save_session, load_session
+
+
+@dataclass
+class Check:
+    name: str
+    passed: bool = True
+    message: str = ""
+
+    def expect(self, condition: bool, message: str) -> None:
+        if not condition and self.passed:
+            self.passed = False
+            self.message = message
+
+
+def check_channel_at_limit() -> Check:
+    """A new channel arriving when the block is exactly full."""
+    check = Check("new channel when full")
+    buffer = ChannelBuffer(max_bytes=160)
+    for i in range(6):
+        buffer.append(float(i), {"a": i})
+    try:
+        buffer.append(6.0, {"b": 6})
+    except IndexError as e:
+        check.expect(False, f"IndexError: {e}")
+        return check
+    check.expect(buffer.time_at(len(buffer) - 1) == 6.0, "last sample lost")
+    return check
+
+
+def check_random_channels(samples: int) -> Check:
+    check = Check("random channels within max_bytes")
+    for max_bytes in (64, 160, 1000, 4096):
+        buffer = ChannelBuffer(capacity=4, max_bytes=max_bytes)
+        for i in range(samples):
+            labels = random.sample([f"ch{c}" for c in range(12)], random.randint(1, 3))
+            buffer.append(float(i), {label: i for label in labels})
+            check.expect(buffer.time_at(len(buffer) - 1) == i, f"sample {i} lost, max_bytes {max_bytes}")
+            check.expect(
+                buffer.nbytes() <= max(max_bytes, 2 * ITEM_SIZE * (1 + len(buffer.labels))),
+                f"{buffer.nbytes()} B held, max_bytes {max_bytes}",
+            )
+    return check
+
+
+def check_restored_prefix(samples: int) -> Check:
+    check = Check("restored samples survive new samples and a save")
+    t = np.arange(samples, dtype=float)
+    values = np.random.default_rng(0).standard_normal((2, samples))
+
+    with tempfile.TemporaryDirectory() as directory:
+        buffer = ChannelBuffer.from_arrays(["a", "b"], t, values, max_bytes=4096)
+        for i in range(samples, 2 * samples):
+            buffer.append(float(i), {"b": i, "c": -i})
+        restored_t, restored_values = buffer.columns(range(3), 0, samples)
+        check.expect(np.array_equal(restored_t, t), "restored times changed")
+        check.expect(np.array_equal(restored_values[:2], values), "restored values changed")
+        check.expect(np.isnan(restored_values[2]).all(), "new channel not NaN in restored samples")
+
+        saved_t, saved_values = buffer.t, buffer.values
+        path = save_session(f"{directory}/check", SerialPortSettings.default(), buffer, [], "")
+        session = load_session(str(path))
+        check.expect(session.plot_data.labels == ["a", "b", "c"], f"labels {session.plot_data.labels}")
+        check.expect(np.array_equal(session.plot_data.t, saved_t), "saved times differ")
+        check.expect(
+            np.array_equal(session.plot_data.values, saved_values, equal_nan=True),
+            "saved values differ",
+        )
+        check.expect(len(session.plot_data) > samples, "restored samples truncated")
+        # The snapshot's files are mapped, drop them before the directory goes
+        del session
+    return check
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    checks = [
+        check_channel_at_limit(),
+        check_random_channels(args.samples),
+        check_restored_prefix(args.samples),
+    ]
+    for check in checks:
+        print(f"{'ok' if check.passed else 'FAILED'}: {check.name} {check.message}")
+    return 0 if all(check.passed for check in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import bisect
+import re
+import threading
+
+# Commands that were never answered are forgotten after this many
+MAX_PENDING = 1000
+# Number of most recent round trips the statistics are computed from
+MAX_SAMPLES = 100_000
+ANY_LINE_ENDING = re.compile(rb"\r\n|\r|\n")
+# Upper edges of the histogram buckets in seconds, the last bucket is open
+HISTOGRAM_EDGES = (
+    0.0001, 0.0002, 0.0005,
+    0.001, 0.002, 0.005,
+    0.01, 0.02, 0.05,
+    0.1, 0.2, 0.5,
+    1.0, 2.0, 5.0,
+)
+
+
+@dataclass
+class LatencyStats:
+    count: int
+    unmatched: int
+    p50: float
+    p99: float
+    max: float
+
+
+class LineSplitter:
+    """
+    Reassembles complete lines from arbitrarily sized chunks.
+
+    Lines end with separator or, if it is None, with any of LF, CR and
+    CRLF. Empty lines are skipped in that case, a CRLF split between two
+    chunks would otherwise produce one.
+    """
+
+    def __init__(self, separator: bytes | None = None):
+        self._separator = separator
+        self._partial = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self._partial += data
+        if self._separator is None:
+            *lines, rest = ANY_LINE_ENDING.split(self._partial)
+            lines = [line for line in lines if line]
+        else:
+            *lines, rest = self._partial.split(self._separator)
+        self._partial = bytearray(rest)
+        return [bytes(line) for line in lines]
+
+
+class LatencyTracker:
+    """
+    Matches transmitted lines with device replies and records round trip times.
+
+    The reply pattern is a regular expression applied to received lines.
+    If it has a capture group, the group is a sequence ID: the same pattern
+    is searched in transmitted lines and a reply is matched with the command
+    carrying the same ID. Without a group every matching reply answers the
+    oldest outstanding command.
+
+    Transmitted data is split into commands on line_ending, the one the
+    commands are actually sent with. Without a line ending every
+    record_sent call is one command. Replies may end with any line ending.
+
+    record_sent is called from the writer and record_received from the
+    reader thread, timestamps are time.perf_counter() values.
+    """
+
+    def __init__(self, reply_pattern: str, line_ending: bytes = b"\n"):
+        self._pattern = re.compile(reply_pattern.encode())
+        self._use_ids = self._pattern.groups > 0
+        self._lock = threading.Lock()
+        self._line_ending = line_ending
+        self._tx_lines = LineSplitter(line_ending)
+        self._rx_lines = LineSplitter()
+        self._pending: OrderedDict[bytes | int, float] = OrderedDict()
+        self._next_command = 0
+        self._latencies = deque(maxlen=MAX_SAMPLES)
+        self._unmatched = 0
+
+    def set_line_ending(self, line_ending: bytes) -> None:
+        with self._lock:
+            if line_ending != self._line_ending:
+                self._line_ending = line_ending
+                self._tx_lines = LineSplitter(line_ending)
+
+    def record_sent(self, data: bytes, timestamp: float) -> None:
+        with self._lock:
+            commands = self._tx_lines.feed(data) if self._line_ending else [data]
+            for line in commands:
+                if self._use_ids:
+                    match = self._pattern.search(line)
+                    if match is None:
+                        continue
+                    key = match.group(1)
+                else:
+                    key = self._next_command
+                    self._next_command += 1
+
+                self._pending[key] = timestamp
+                if len(self._pending) > MAX_PENDING:
+                    self._pending.popitem(last=False)
+                    self._unmatched += 1
+
+    def record_received(self, data: bytes, timestamp: float) -> None:
+        with self._lock:
+            for line in self._rx_lines.feed(data):
+                match = self._pattern.search(line)
+                if match is None or not self._pending:
+                    continue
+
+                if self._use_ids:
+                    sent = self._pending.pop(match.group(1), None)
+                else:
+                    _, sent = self._pending.popitem(last=False)
+
+                if sent is not None:
+                    self._latencies.append(timestamp - sent)
+
+    def stats(self) -> LatencyStats:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            unmatched = self._unmatched + len(self._pending)
+
+        if not latencies:
+            return LatencyStats(0, unmatched, 0.0, 0.0, 0.0)
+        return LatencyStats(
+            count=len(latencies),
+            unmatched=unmatched,
+            p50=percentile(latencies, 50),
+            p99=percentile(latencies, 99),
+            max=latencies[-1],
+        )
+
+    def histogram(self) -> list[tuple[float, int]]:
+        """Counts per bucket as (upper edge, count), the last edge is infinity."""
+        counts = [0] * (len(HISTOGRAM_EDGES) + 1)
+        with self._lock:
+            for latency in self._latencies:
+                counts[bisect.bisect_left(HISTOGRAM_EDGES, latency)] += 1
+        return list(zip(HISTOGRAM_EDGES + (float("inf"),), counts))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._latencies.clear()
+            self._unmatched = 0
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
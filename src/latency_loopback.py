@@ -0,0 +1,72 @@
+"""
+Headless loopback check of the latency measurement: numbered commands are
+sent through SerialWriter to an echoing pty VirtualDevice opened with
+RealSerialPort, and every echo must be matched with its command. Runs once
+per line ending, with sequence IDs and in FIFO mode. Exits with status 1 on
+a mismatch.
+
+    python latency_loopback.py [--lines 500]
+"""
+from dataclasses import replace
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from latency import LatencyTracker
+from serial_port import RealSerialPort, SerialPortSettings, ReadingMode
+from serial_writer import SerialWriter
+from virtual_device import VirtualDevice, VirtualDeviceSettings, DevicePattern
+
+LINE_ENDINGS = {"LF": b"\n", "CR": b"\r", "CRLF": b"\r\n"}
+REPLY_PATTERNS = {"ids": r"cmd (\d+)", "fifo": r"cmd"}
+TIMEOUT = 10.0
+
+
+def run_loopback(line_ending: bytes, reply_pattern: str, lines: int) -> bool:
+    settings = replace(SerialPortSettings.default(), reading_mode=ReadingMode.READ_BYTE, timeout=0.01)
+    tracker = LatencyTracker(reply_pattern, line_ending)
+    writer = SerialWriter()
+    writer.latency_tracker = tracker
+
+    with VirtualDevice(VirtualDeviceSettings(pattern=DevicePattern.SILENT, echo=True)) as device:
+        port = RealSerialPort(device.port_name, settings)
+        writer.set_port(port, settings)
+        writer.start()
+        for number in range(lines):
+            writer.send(f"cmd {number}".encode() + line_ending)
+
+        deadline = time.monotonic() + TIMEOUT
+        while tracker.stats().count < lines and time.monotonic() < deadline:
+            tracker.record_received(port.read(), time.perf_counter())
+
+        writer.shutdown()
+        writer.wait()
+        port.close()
+
+    stats = tracker.stats()
+    passed = stats.count == lines and stats.unmatched == 0
+    print(
+        f"  {'ok' if passed else 'FAILED'}: matched {stats.count}/{lines}, "
+        f"unmatched {stats.unmatched}, p50 {stats.p50 * 1000:.2f} ms, p99 {stats.p99 * 1000:.2f} ms"
+    )
+    return passed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=500)
+    args = parser.parse_args()
+
+    app = QCoreApplication()
+    passed = True
+    for ending_name, line_ending in LINE_ENDINGS.items():
+        for mode, reply_pattern in REPLY_PATTERNS.items():
+            print(f"{ending_name} line ending, {mode}:")
+            passed = run_loopback(line_ending, reply_pattern, args.lines) and passed
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
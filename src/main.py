@@ -1,30 +1,42 @@
+from collections import deque
 import json
+import re
 from PySide6.QtWidgets import (
     QMainWindow,
     QToolBar,
     QApplication,
     QComboBox,
     QPushButton,
+    QCheckBox,
     QDialog,
     QMessageBox,
+    QFileDialog,
+    QInputDialog,
+    QLabel,
 )
-from PySide6.QtCore import Slot, QSettings, QStringListModel
+from PySide6.QtCore import Slot, QSettings, QStringListModel, QTimer
 from PySide6.QtGui import QTextCursor
 
 from enum import Enum
 import time
-import serial.tools.list_ports
-import serial.serialutil
 
 from mainwindow_ui import Ui_MainWindow
 from settings_dialog import SettingsDialog
 from port_settings_tab import save_serial_settings, load_serial_settings
 from serial_thread import SerialThread
-from serial_port import ReadingMode, SerialPort, RealSerialPort, FakeSerialPort
-
-import pyqtgraph as pg
-pg.setConfigOption("background", "w")
-pg.setConfigOption("foreground", "k")
+from port_watcher import PortWatcher
+from latency import LatencyTracker
+from text_decoder import TextDecoder
+from adaptive_reader import ReadStats
+from memory_guard import MemoryGuard, Probe
+from virtual_device import VirtualDevice, VIRTUAL_DEVICE_SUPPORTED
+from serial_port import (
+    ReadingMode,
+    SerialPort,
+    SerialPortSettings,
+    RealSerialPort,
+    FakeSerialPort,
+)
 
 
 class LineEnding(Enum):
@@ -40,7 +52,20 @@ class ThreadControlButtonText(Enum):
 
 
 FAKE_PORT_NAME = "fakePort"
+VIRTUAL_PORT_NAME = "virtualDevice"
 MAX_SAMPLES = 50
+# Lines of a restored session's text loaded into the text view at a time
+RESTORED_PAGE_LINES = 10000
+# Memory bounds for sessions that run for days
+MAX_PLOT_BYTES = 256 * 1024 * 1024
+MAX_TEXT_LINES = 100_000
+MAX_PENDING_TEXT_BYTES = 16 * 1024 * 1024
+# The line limit does not bound long lines, this is only checked by the
+# memory diagnostics
+TEXT_VIEW_CHAR_BUDGET = 32 * 1024 * 1024
+DEFAULT_STREAM_ADDRESS = "tcp:127.0.0.1:7777"
+MEMORY_CHECK_INTERVAL_MS = 60_000
+MEMORY_GROWTH_BUDGET = 64 * 1024 * 1024
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
@@ -60,27 +85,41 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.portChoice = QComboBox()
         self.portChoice.setPlaceholderText("Choose serial device")
-        self.portChoice.setCurrentText(FAKE_PORT_NAME)
         self.previousPortChoice = FAKE_PORT_NAME
-        self.handle_refresh_port_list()
+        self.portChoice.addItem(FAKE_PORT_NAME)
+        # After addItem, with a placeholder the combo box starts at index -1
+        self.portChoice.setCurrentText(FAKE_PORT_NAME)
         self.toolbar.addWidget(self.portChoice)
 
         self.refreshPortList = QPushButton()
         self.refreshPortList.setText("Refresh Ports")
         self.toolbar.addWidget(self.refreshPortList)
 
+        self.autoReconnect = QCheckBox("Auto reconnect")
+        self.autoReconnect.setChecked(True)
+        self.toolbar.addWidget(self.autoReconnect)
+
         self.threadControlButton = QPushButton()
         self.threadControlButton.setText(ThreadControlButtonText.PAUSE_THREAD.value)
         self.toolbar.addWidget(self.threadControlButton)
         # End setup toolbar
 
         # Setup plot display
-        self.plotData = {"default": [], "t": []}
+        # The plot widget (and with it pyqtgraph) is only created when the
+        # plot tab is first opened, see ensure_plot_display. Likewise the
+        # sample buffer (numpy) is created with the first sample.
+        self.plotDisplay = None
+        self.plotData = None
+        self.restoredHiddenChannels = []
         self.timeStart = time.monotonic()
 
-        self.curves = {"default": self.plotDisplay.plot()}
-        self.curves["default"].setPen((200,200,100))
-
+        # Received bytes waiting to be shown in the text view
+        self.pendingText = deque()
+        self.pendingTextBytes = 0
+        self.textDisplay.setMaximumBlockCount(MAX_TEXT_LINES)
+        # Pages the text of a restored session through the text view
+        self.textPager = None
+        self.textDecoder = TextDecoder(self.loaded_settings.encoding)
 
         # Line ending choice setup
         self.lineEndChoice.setPlaceholderText("New Line")
@@ -88,84 +127,196 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.lineEndChoice.setCurrentText(LineEnding.NEW_LINE.value)
 
         # Serial reader thread
-        self.serialThread = SerialThread(self.get_serial_port())
+        self.virtualDevice = None
+        self.serialThread = SerialThread(self.create_serial_port)
+        self.serialThread.open_port(FAKE_PORT_NAME, self.loaded_settings)
         self.serialThread.start()
 
+        self.rxStats = QLabel()
+        self.statusbar.addPermanentWidget(self.rxStats)
+        self.txStats = QLabel()
+        self.statusbar.addPermanentWidget(self.txStats)
+
+        # Request/response latency measurement
+        self.latencyTracker = None
+        self.latencyStats = QLabel()
+        self.statusbar.addPermanentWidget(self.latencyStats)
+        self.latencyTimer = QTimer(self)
+        self.latencyTimer.setInterval(1000)
+
+        # Memory diagnostics, off by default as tracemalloc slows everything down
+        self.memoryGuard = MemoryGuard(
+            [
+                Probe("Plot samples", lambda: self.plotData.nbytes() if self.plotData is not None else 0, MAX_PLOT_BYTES, " B"),
+                Probe("Text view", lambda: self.textDisplay.document().characterCount(), TEXT_VIEW_CHAR_BUDGET, " chars"),
+                Probe("Pending text", lambda: self.pendingTextBytes, MAX_PENDING_TEXT_BYTES, " B"),
+                Probe("Pooled ports", self.serialThread.pooled_ports),
+                Probe("Queued writes", self.serialThread.writer.queued_jobs, 1000),
+            ],
+            growth_budget=MEMORY_GROWTH_BUDGET,
+        )
+        self.memoryTimer = QTimer(self)
+        self.memoryTimer.setInterval(MEMORY_CHECK_INTERVAL_MS)
+
+        # Publishing the port data to local network subscribers
+        self.streamServer = None
+        self.streamStats = QLabel()
+        self.statusbar.addPermanentWidget(self.streamStats)
+        self.streamTimer = QTimer(self)
+        self.streamTimer.setInterval(1000)
+
+        # Background port enumeration and hot-plug detection
+        self.knownPorts = {}
+        self.lostPortSerialNumber = None
+        self.portWatcher = PortWatcher()
+
         # Connecting signals & slots
         self.actionExit.triggered.connect(self.close)
         self.actionSettings.triggered.connect(self.handle_settings_action)
+        self.actionOpenSession.triggered.connect(self.handle_open_session_action)
+        self.actionSaveSession.triggered.connect(self.handle_save_session_action)
+        self.actionSendFile.triggered.connect(self.handle_send_file_action)
+        self.actionReplayScript.triggered.connect(self.handle_replay_script_action)
+        self.actionCancelTransfer.triggered.connect(self.serialThread.writer.cancel)
+        self.actionMeasureLatency.toggled.connect(self.handle_measure_latency_action)
+        self.latencyTimer.timeout.connect(self.update_latency_stats)
+        self.lineEndChoice.currentTextChanged.connect(self.handle_line_ending_changed)
+        self.actionMemoryDiagnostics.toggled.connect(self.handle_memory_diagnostics_action)
+        self.memoryTimer.timeout.connect(self.check_memory)
+        self.actionStreamToNetwork.toggled.connect(self.handle_stream_to_network_action)
+        self.streamTimer.timeout.connect(self.update_stream_stats)
         self.refreshPortList.clicked.connect(self.handle_refresh_port_list)
         self.threadControlButton.clicked.connect(self.handle_thread_control_button)
         self.serialThread.new_data.connect(self.handle_new_data)
+        self.serialThread.port_error.connect(self.handle_port_error)
+        self.serialThread.port_opened.connect(self.handle_port_opened)
+        self.serialThread.port_open_failed.connect(self.handle_port_open_failed)
+        self.serialThread.read_stats.connect(self.handle_read_stats)
+        self.serialThread.writer.tx_stats.connect(self.handle_tx_stats)
+        self.serialThread.writer.write_error.connect(self.handle_write_error)
+        self.serialThread.writer.job_finished.connect(self.handle_transfer_finished)
+        self.serialThread.writer.job_cancelled.connect(self.handle_transfer_cancelled)
+        self.portWatcher.ports_changed.connect(self.handle_ports_changed)
         self.portChoice.currentTextChanged.connect(self.handle_new_port_choice)
         self.textInput.returnPressed.connect(self.handle_user_input)
+        self.tabWidget.currentChanged.connect(self.handle_tab_changed)
+
+        self.portWatcher.start()
 
-    def get_serial_port(self) -> SerialPort:
-        port_id = self.portChoice.currentText()
+    def create_serial_port(self, port_id: str, settings: SerialPortSettings) -> SerialPort:
+        """Port factory, called on the serial thread."""
         if port_id == FAKE_PORT_NAME:
-            return FakeSerialPort(self.loaded_settings)
-        return RealSerialPort(port_id, self.loaded_settings)
+            return FakeSerialPort(settings)
+        if port_id == VIRTUAL_PORT_NAME:
+            # A pty driven by a background thread, read through pyserial
+            if self.virtualDevice is None:
+                self.virtualDevice = VirtualDevice().start()
+            return RealSerialPort(self.virtualDevice.port_name, settings)
+        return RealSerialPort(port_id, settings)
+
+    def ensure_plot_data(self) -> None:
+        if self.plotData is None:
+            from channel_buffer import ChannelBuffer
+            self.plotData = ChannelBuffer(max_bytes=MAX_PLOT_BYTES)
+
+    def ensure_plot_display(self) -> None:
+        if self.plotDisplay is not None:
+            return
+
+        from multi_channel_plot import MultiChannelPlot
+
+        self.ensure_plot_data()
+        self.plotDisplay = MultiChannelPlot(self.plotData, self.plotView)
+        self.plotDisplay.setObjectName("plotDisplay")
+        self.verticalLayout_3.addWidget(self.plotDisplay)
+        for label in self.restoredHiddenChannels:
+            self.plotDisplay.set_channel_visible(label, False)
 
-    def stop_serial_port(self) -> None:
-        self.serialThread.pause()
-        while not self.serialThread.is_paused():
-            time.sleep(0.1)
-        
     @Slot(str)
     def handle_new_port_choice(self, text):
-        self.stop_serial_port()
+        # An explicit choice wins over reconnecting to a device that was lost
+        self.lostPortSerialNumber = None
+        # Opening happens on the serial thread, see handle_port_opened
+        self.serialThread.open_port(text, self.loaded_settings)
 
-        try:
-            new_port = self.get_serial_port()
-        except serial.serialutil.SerialException as e:
-            QMessageBox.critical(self, f"Error while configuring port", str(e))
-            self.portChoice.setCurrentText(self.previousPortChoice)
-            new_port = None
-        else:
-            self.previousPortChoice = text
+    @Slot(str)
+    def handle_port_opened(self, port_id: str):
+        self.previousPortChoice = port_id
+        self.threadControlButton.setText(ThreadControlButtonText.PAUSE_THREAD.value)
 
-        self.serialThread.resume(new_port)
+    @Slot(str, str)
+    def handle_port_open_failed(self, port_id: str, message: str):
+        QMessageBox.critical(self, f"Error while configuring port", message)
+        self.portChoice.blockSignals(True)
+        self.portChoice.setCurrentText(self.previousPortChoice)
+        self.portChoice.blockSignals(False)
         
     @Slot()
     def handle_thread_control_button(self):
         if self.serialThread.is_paused():
-            self.serialThread.resume()
+            # Reopens the port if it was lost and applies restored settings
+            self.serialThread.open_port(self.portChoice.currentText(), self.loaded_settings)
             self.threadControlButton.setText(ThreadControlButtonText.PAUSE_THREAD.value)
         else:
             self.serialThread.pause()
             self.threadControlButton.setText(ThreadControlButtonText.RESUME_THREAD.value)
 
-    @Slot(str)
-    def handle_new_data(self, data: str):
-        self.textDisplay.moveCursor(QTextCursor.MoveOperation.End)
-        self.textDisplay.insertPlainText(data)
-        self.textDisplay.moveCursor(QTextCursor.MoveOperation.End)
+    @Slot(object)
+    def handle_new_data(self, data: bytes):
+        # Text is only decoded for the text view, and only while it is shown
+        self.pendingText.append(data)
+        self.pendingTextBytes += len(data)
+        # Older text would be dropped from the text view anyway
+        while self.pendingTextBytes > MAX_PENDING_TEXT_BYTES:
+            self.pendingTextBytes -= len(self.pendingText.popleft())
+        if self.tabWidget.currentWidget() is self.textView:
+            self.flush_pending_text()
 
         if self.loaded_settings.reading_mode is ReadingMode.READ_LINE:
-            parsed_data = json.loads(data)
+            # json accepts UTF-8/16/32 bytes directly
+            try:
+                parsed_data = json.loads(data)
+            except ValueError:
+                return  # Not a JSON line, nothing to plot
 
-            new_data_added = False
+            sample = {}
 
             if isinstance(parsed_data, (int, float)):
-                new_data_added = True
-                self.plotData["default"].append(parsed_data)
+                sample["default"] = parsed_data
 
             elif isinstance(parsed_data, dict):
                 for label, data_point in parsed_data.items():
                     # TODO: flatten the dict
                     assert isinstance(data_point, (int, float))
-                    new_data_added = True
-                    if label not in self.plotData:
-                        self.plotData[label] = [data_point]
-                        self.curves[label] = self.plotDisplay.plot()
-                        self.curves[label].setPen((200,0,0), width=3)
-                    else:
-                        self.plotData[label].append(data_point)
+                    sample[label] = data_point
                     
-            if new_data_added:
-                self.plotData["t"].append(time.monotonic() - self.timeStart)
-                for label, curve in self.curves.items():
-                    curve.setData(x=self.plotData["t"], y=self.plotData[label])
+            if sample:
+                self.ensure_plot_data()
+                new_labels = self.plotData.append(time.monotonic() - self.timeStart, sample)
+                if self.plotDisplay is not None:
+                    if new_labels:
+                        self.plotDisplay.sync_channels()
+                    self.plotDisplay.request_redraw()
+
+    def flush_pending_text(self) -> None:
+        if not self.pendingText:
+            return
+        text = self.textDecoder.decode(b"".join(self.pendingText))
+        self.pendingText.clear()
+        self.pendingTextBytes = 0
+
+        self.textDisplay.moveCursor(QTextCursor.MoveOperation.End)
+        self.textDisplay.insertPlainText(text)
+        if self.textPager is not None:
+            self.textPager.trim()
+        self.textDisplay.moveCursor(QTextCursor.MoveOperation.End)
+
+    @Slot(int)
+    def handle_tab_changed(self, index: int):
+        if self.tabWidget.widget(index) is self.plotView:
+            self.ensure_plot_display()
+        elif self.tabWidget.widget(index) is self.textView:
+            self.flush_pending_text()
 
     @Slot()
     def handle_settings_action(self):
@@ -175,48 +326,341 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if result == QDialog.DialogCode.Accepted:
             save_serial_settings(self.saved_settings, dialog.settings)
             self.loaded_settings = dialog.settings
-            self.stop_serial_port()
-            self.serialThread.resume(
-                self.get_serial_port()
+            self.update_text_decoder()
+            # Applied in place on the open port when possible
+            self.serialThread.open_port(
+                self.portChoice.currentText(), self.loaded_settings
             )
 
 
+    def update_text_decoder(self) -> None:
+        if self.textDecoder.encoding is not self.loaded_settings.encoding:
+            # Data received so far is still shown with the old encoding
+            self.flush_pending_text()
+            self.textDecoder = TextDecoder(self.loaded_settings.encoding)
+
     @Slot()
-    def handle_refresh_port_list(self):        
-        available_ports = sorted(
-            [port_info[0] for port_info in serial.tools.list_ports.comports()]
-        ) + [FAKE_PORT_NAME, self.previousPortChoice]  # Do not change the current port
+    def handle_refresh_port_list(self):
+        self.portWatcher.refresh()
+
+    @Slot(list)
+    def handle_ports_changed(self, ports: list):
+        previous_ports = self.knownPorts
+        self.knownPorts = {port_info.device: port_info for port_info in ports}
+
+        current = self.previousPortChoice
+        if current in previous_ports and current not in self.knownPorts:
+            self.lostPortSerialNumber = previous_ports[current].serial_number
+
+        available_ports = list(self.knownPorts) + [FAKE_PORT_NAME]
+        if VIRTUAL_DEVICE_SUPPORTED:
+            available_ports.append(VIRTUAL_PORT_NAME)
+        if current not in available_ports:
+            available_ports.append(current)  # Do not change the current port
 
         self.portChoice.blockSignals(True)  # Do not trigger a reconnect
-        self.portChoice.clear()
-        self.portChoice.addItems(available_ports)
-        self.portChoice.setCurrentText(self.previousPortChoice)
+        for index in reversed(range(self.portChoice.count())):
+            if self.portChoice.itemText(index) not in available_ports:
+                self.portChoice.removeItem(index)
+        for index, port in enumerate(available_ports):
+            if self.portChoice.itemText(index) != port:
+                existing = self.portChoice.findText(port)
+                if existing != -1:
+                    self.portChoice.removeItem(existing)
+                self.portChoice.insertItem(index, port)
+        self.portChoice.setCurrentText(current)
         self.portChoice.blockSignals(False)
 
+        self.reconnect_lost_port()
+
+    def reconnect_lost_port(self) -> None:
+        if self.lostPortSerialNumber is None or not self.autoReconnect.isChecked():
+            return
+
+        for device, port_info in self.knownPorts.items():
+            if port_info.serial_number == self.lostPortSerialNumber:
+                self.lostPortSerialNumber = None
+                self.portChoice.blockSignals(True)
+                self.portChoice.setCurrentText(device)
+                self.portChoice.blockSignals(False)
+                self.statusbar.showMessage(f"Reconnecting to {device}", 5000)
+                self.handle_new_port_choice(device)
+                return
+
+    @Slot(str)
+    def handle_port_error(self, message: str):
+        self.statusbar.showMessage(f"Port error: {message}")
+        self.threadControlButton.setText(ThreadControlButtonText.RESUME_THREAD.value)
+
     @Slot()
     def handle_user_input(self):
         line = self.textInput.text().strip()
         self.textInput.setText("")
+        self.serialThread.send_line(line + self.line_ending())
+
+    def line_ending(self) -> str:
         ending = LineEnding(self.lineEndChoice.currentText())
         match ending:
             case LineEnding.NEW_LINE:
-                line += "\n"
+                return "\n"
             case LineEnding.CARRIAGE_RETURN:
-                line += "\r"
+                return "\r"
             case LineEnding.BOTH_NL_AND_CR:
-                line += "\r\n"
-            
-        self.serialThread.send_line(line)
+                return "\r\n"
+            case LineEnding.NO_LINE_ENDING:
+                return ""
+
+    @Slot()
+    def handle_save_session_action(self):
+        from session import save_session, SESSION_SUFFIX
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save session", "", f"Serial Viewer session (*{SESSION_SUFFIX})"
+        )
+        if not path:
+            return
+
+        hidden_channels = [] if self.plotDisplay is None else self.plotDisplay.hidden_channels()
+        self.flush_pending_text()
+        try:
+            directory = save_session(
+                path,
+                self.loaded_settings,
+                self.plotData,
+                hidden_channels,
+                self.textDisplay.toPlainText() if self.textPager is None else self.textPager.live_text(),
+                None if self.textPager is None else self.textPager.text,
+            )
+        except OSError as e:
+            QMessageBox.critical(self, "Error while saving session", str(e))
+            return
+        self.statusbar.showMessage(f"Session saved to {directory}", 5000)
+
+    @Slot()
+    def handle_open_session_action(self):
+        from session import load_session
+        from text_pager import TextPager
+
+        path = QFileDialog.getExistingDirectory(self, "Open session")
+        if not path:
+            return
+
+        try:
+            session = load_session(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error while opening session", str(e))
+            return
+
+        # Do not mix the restored capture with new data until resumed
+        self.serialThread.pause()
+        self.threadControlButton.setText(ThreadControlButtonText.RESUME_THREAD.value)
+
+        self.loaded_settings = session.settings
+        save_serial_settings(self.saved_settings, session.settings)
+        self.update_text_decoder()
+        self.pendingText.clear()
+        self.pendingTextBytes = 0
+
+        self.plotData = session.plot_data
+        # Bounds the samples received from now on, restored ones stay on disk
+        self.plotData.max_bytes = MAX_PLOT_BYTES
+        restored_time = self.plotData.time_at(len(self.plotData) - 1) if len(self.plotData) else 0.0
+        self.timeStart = time.monotonic() - restored_time
+        if self.plotDisplay is not None:
+            self.plotDisplay.set_buffer(self.plotData, session.hidden_channels)
+        else:
+            self.restoredHiddenChannels = session.hidden_channels
+
+        if self.textPager is not None:
+            self.textPager.detach()
+        self.textPager = TextPager(self.textDisplay, session.text, RESTORED_PAGE_LINES, MAX_TEXT_LINES)
+        self.statusbar.showMessage(
+            f"Restored {len(session.plot_data)} samples and {len(session.text)} lines "
+            f"(scroll up for older lines)",
+            5000,
+        )
+
+    @Slot()
+    def handle_send_file_action(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Send file")
+        if path:
+            self.serialThread.writer.send_file(path)
+
+    @Slot()
+    def handle_replay_script_action(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Replay script")
+        if not path:
+            return
+        line_delay, ok = QInputDialog.getDouble(
+            self, "Replay script", "Delay after each line [s]", 0.1, 0.0, 60.0, 3
+        )
+        if ok:
+            self.serialThread.writer.send_script(
+                path, self.line_ending().encode(), line_delay
+            )
+
+    @Slot(object)
+    def handle_read_stats(self, stats: ReadStats):
+        self.rxStats.setText(
+            f"RX {stats.bytes_per_second / 1000:.1f} kB/s, "
+            f"{stats.port_calls_per_second:.0f} port calls/s"
+        )
+        self.rxStats.setToolTip(
+            f"Read size {stats.chunk_size} B, timeout {stats.timeout * 1000:g} ms"
+        )
+
+    @Slot(float, int)
+    def handle_tx_stats(self, bytes_per_second: float, total_bytes: int):
+        self.txStats.setText(f"TX {bytes_per_second / 1000:.1f} kB/s, {total_bytes} B total")
+
+    @Slot(str)
+    def handle_write_error(self, message: str):
+        self.statusbar.showMessage(f"Write error: {message}", 5000)
+
+    @Slot(str)
+    def handle_transfer_finished(self, path: str):
+        self.statusbar.showMessage(f"Finished sending {path}", 5000)
+
+    @Slot(str)
+    def handle_transfer_cancelled(self, path: str):
+        self.statusbar.showMessage(f"Cancelled sending {path}", 5000)
+
+    @Slot(bool)
+    def handle_measure_latency_action(self, checked: bool):
+        if not checked:
+            self.serialThread.set_latency_tracker(None)
+            self.latencyTracker = None
+            self.latencyTimer.stop()
+            self.latencyStats.setText("")
+            return
+
+        pattern, ok = QInputDialog.getText(
+            self,
+            "Measure latency",
+            "Reply pattern (regex, a capture group matches sequence IDs)",
+            text=r".",
+        )
+        try:
+            tracker = LatencyTracker(pattern, self.line_ending().encode()) if ok else None
+        except re.error as e:
+            QMessageBox.critical(self, "Invalid reply pattern", str(e))
+            tracker = None
+
+        if tracker is None:
+            self.actionMeasureLatency.blockSignals(True)
+            self.actionMeasureLatency.setChecked(False)
+            self.actionMeasureLatency.blockSignals(False)
+            return
+
+        self.latencyTracker = tracker
+        self.serialThread.set_latency_tracker(tracker)
+        self.latencyTimer.start()
+        self.update_latency_stats()
+
+    @Slot(str)
+    def handle_line_ending_changed(self, _):
+        if self.latencyTracker is not None:
+            self.latencyTracker.set_line_ending(self.line_ending().encode())
+
+    @Slot()
+    def update_latency_stats(self):
+        stats = self.latencyTracker.stats()
+        self.latencyStats.setText(
+            f"RTT n={stats.count} p50={stats.p50 * 1000:.2f} ms "
+            f"p99={stats.p99 * 1000:.2f} ms max={stats.max * 1000:.2f} ms "
+            f"unmatched={stats.unmatched}"
+        )
+        self.latencyStats.setToolTip("\n".join(
+            f"<= {edge * 1000:g} ms: {count}" for edge, count in self.latencyTracker.histogram()
+        ))
+
+    @Slot(bool)
+    def handle_memory_diagnostics_action(self, checked: bool):
+        if checked:
+            self.memoryGuard.start()
+            self.check_memory()
+            self.memoryTimer.start()
+        else:
+            self.memoryTimer.stop()
+            self.memoryGuard.stop()
+
+    @Slot()
+    def check_memory(self):
+        warnings = self.memoryGuard.sample()
+        sample = self.memoryGuard.history[-1]
+        print(
+            f"Memory: traced {sample.traced_bytes / 1024 / 1024:.1f} MiB, "
+            + ", ".join(f"{name} {size}" for name, size in sample.sizes.items())
+        )
+        for warning in warnings:
+            print(f"Memory warning: {warning}")
+        if warnings:
+            self.statusbar.showMessage(f"Memory warning: {warnings[0]}", MEMORY_CHECK_INTERVAL_MS)
+
+    @Slot(bool)
+    def handle_stream_to_network_action(self, checked: bool):
+        if not checked:
+            self.stop_stream_server()
+            return
+
+        address, ok = QInputDialog.getText(
+            self,
+            "Stream to network",
+            "Address (tcp:<host>:<port> or unix:<path>)",
+            text=self.saved_settings.value("streamAddress", DEFAULT_STREAM_ADDRESS),
+        )
+        server = None
+        if ok:
+            from stream_server import StreamServer
+            try:
+                server = StreamServer(address).start()
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(self, "Cannot start streaming", str(e))
+
+        if server is None:
+            self.actionStreamToNetwork.blockSignals(True)
+            self.actionStreamToNetwork.setChecked(False)
+            self.actionStreamToNetwork.blockSignals(False)
+            return
+
+        self.saved_settings.setValue("streamAddress", address)
+        self.streamServer = server
+        self.serialThread.set_publisher(server.publish)
+        self.streamTimer.start()
+        self.update_stream_stats()
+
+    def stop_stream_server(self):
+        if self.streamServer is None:
+            return
+        self.serialThread.set_publisher(None)
+        self.streamServer.stop()
+        self.streamServer = None
+        self.streamTimer.stop()
+        self.streamStats.setText("")
+
+    @Slot()
+    def update_stream_stats(self):
+        self.streamStats.setText(
+            f"Stream clients={self.streamServer.clients()} "
+            f"dropped={self.streamServer.dropped_batches()}"
+        )
 
     def closeEvent(self, event):
         self.serialThread.shutdown()
-        while self.serialThread.isRunning():
+        self.portWatcher.shutdown()
+        while self.serialThread.isRunning() or self.portWatcher.isRunning():
             time.sleep(0.01)
+        self.stop_stream_server()
+        if self.virtualDevice is not None:
+            self.virtualDevice.stop()
         super().closeEvent(event)
 
-app = QApplication()
 
-window = MainWindow()
-window.show()
+if __name__ == "__main__":
+    app = QApplication()
+
+    window = MainWindow()
+    window.show()
+
+    app.exec()
 
-app.exec()
@@ -21,8 +21,6 @@ from PySide6.QtWidgets import (QApplication, QComboBox, QHBoxLayout, QLineEdit,
     QSizePolicy, QStatusBar, QTabWidget, QVBoxLayout,
     QWidget)
 
-from pyqtgraph import PlotWidget
-
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         if not MainWindow.objectName():
@@ -32,6 +30,25 @@ class Ui_MainWindow(object):
         self.actionExit.setObjectName(u"actionExit")
         self.actionSettings = QAction(MainWindow)
         self.actionSettings.setObjectName(u"actionSettings")
+        self.actionOpenSession = QAction(MainWindow)
+        self.actionOpenSession.setObjectName(u"actionOpenSession")
+        self.actionSaveSession = QAction(MainWindow)
+        self.actionSaveSession.setObjectName(u"actionSaveSession")
+        self.actionSendFile = QAction(MainWindow)
+        self.actionSendFile.setObjectName(u"actionSendFile")
+        self.actionReplayScript = QAction(MainWindow)
+        self.actionReplayScript.setObjectName(u"actionReplayScript")
+        self.actionCancelTransfer = QAction(MainWindow)
+        self.actionCancelTransfer.setObjectName(u"actionCancelTransfer")
+        self.actionMeasureLatency = QAction(MainWindow)
+        self.actionMeasureLatency.setObjectName(u"actionMeasureLatency")
+        self.actionMeasureLatency.setCheckable(True)
+        self.actionMemoryDiagnostics = QAction(MainWindow)
+        self.actionMemoryDiagnostics.setObjectName(u"actionMemoryDiagnostics")
+        self.actionMemoryDiagnostics.setCheckable(True)
+        self.actionStreamToNetwork = QAction(MainWindow)
+        self.actionStreamToNetwork.setObjectName(u"actionStreamToNetwork")
+        self.actionStreamToNetwork.setCheckable(True)
         self.centralwidget = QWidget(MainWindow)
         self.centralwidget.setObjectName(u"centralwidget")
         self.verticalLayout = QVBoxLayout(self.centralwidget)
@@ -53,11 +70,6 @@ class Ui_MainWindow(object):
         self.plotView.setObjectName(u"plotView")
         self.verticalLayout_3 = QVBoxLayout(self.plotView)
         self.verticalLayout_3.setObjectName(u"verticalLayout_3")
-        self.plotDisplay = PlotWidget(self.plotView)
-        self.plotDisplay.setObjectName(u"plotDisplay")
-
-        self.verticalLayout_3.addWidget(self.plotDisplay)
-
         self.tabWidget.addTab(self.plotView, "")
 
         self.verticalLayout.addWidget(self.tabWidget)
@@ -95,8 +107,18 @@ class Ui_MainWindow(object):
         self.menubar.addAction(self.menu_File.menuAction())
         self.menubar.addAction(self.menu_Edit.menuAction())
         self.menubar.addAction(self.menu_Help.menuAction())
+        self.menu_File.addAction(self.actionOpenSession)
+        self.menu_File.addAction(self.actionSaveSession)
+        self.menu_File.addSeparator()
+        self.menu_File.addAction(self.actionSendFile)
+        self.menu_File.addAction(self.actionReplayScript)
+        self.menu_File.addAction(self.actionCancelTransfer)
+        self.menu_File.addSeparator()
         self.menu_File.addAction(self.actionSettings)
         self.menu_File.addAction(self.actionExit)
+        self.menu_Edit.addAction(self.actionMeasureLatency)
+        self.menu_Edit.addAction(self.actionMemoryDiagnostics)
+        self.menu_Edit.addAction(self.actionStreamToNetwork)
 
         self.retranslateUi(MainWindow)
 
@@ -110,6 +132,14 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(QCoreApplication.translate("MainWindow", u"Serial Viewer", None))
         self.actionExit.setText(QCoreApplication.translate("MainWindow", u"E&xit", None))
         self.actionSettings.setText(QCoreApplication.translate("MainWindow", u"&Settings", None))
+        self.actionOpenSession.setText(QCoreApplication.translate("MainWindow", u"&Open session...", None))
+        self.actionSaveSession.setText(QCoreApplication.translate("MainWindow", u"Save session &as...", None))
+        self.actionSendFile.setText(QCoreApplication.translate("MainWindow", u"Send &file...", None))
+        self.actionReplayScript.setText(QCoreApplication.translate("MainWindow", u"&Replay script...", None))
+        self.actionCancelTransfer.setText(QCoreApplication.translate("MainWindow", u"&Cancel transfer", None))
+        self.actionMeasureLatency.setText(QCoreApplication.translate("MainWindow", u"Measure &latency...", None))
+        self.actionMemoryDiagnostics.setText(QCoreApplication.translate("MainWindow", u"Memory &diagnostics", None))
+        self.actionStreamToNetwork.setText(QCoreApplication.translate("MainWindow", u"&Stream to network...", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.textView), QCoreApplication.translate("MainWindow", u"Text View", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.plotView), QCoreApplication.translate("MainWindow", u"Plot View", None))
         self.textInput.setPlaceholderText(QCoreApplication.translate("MainWindow", u"Type text to send ...", None))
@@ -0,0 +1,96 @@
+"""
+Memory diagnostics for long running sessions.
+
+Every sample records the size of each subsystem (through probe callables)
+and a tracemalloc snapshot. Warnings are produced when a subsystem exceeds
+its budget or when traced memory grows by more than the growth budget
+since the first sample.
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+import time
+import tracemalloc
+
+# Frames kept per traced allocation, one is enough to group by module
+TRACEBACK_LIMIT = 1
+MAX_HISTORY = 1000
+
+
+@dataclass
+class Probe:
+    """
+    A subsystem size, e.g. the bytes held by the plot buffer or the
+    number of lines in the text view. budget is in the same unit.
+    """
+    name: str
+    measure: Callable[[], int]
+    budget: int | None = None
+    unit: str = ""
+
+
+@dataclass
+class MemorySample:
+    timestamp: float
+    traced_bytes: int
+    sizes: dict[str, int]
+
+
+class MemoryGuard:
+
+    def __init__(self, probes: list[Probe], growth_budget: int) -> None:
+        self.probes = probes
+        self.growth_budget = growth_budget
+        self.history: deque[MemorySample] = deque(maxlen=MAX_HISTORY)
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_LIMIT)
+            self._started_tracing = True
+        self._baseline = None
+        self.history.clear()
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._baseline = None
+
+    def sample(self) -> list[str]:
+        """Record a sample and return the warnings for it."""
+        snapshot = tracemalloc.take_snapshot()
+        traced_bytes, _ = tracemalloc.get_traced_memory()
+        sizes = {probe.name: probe.measure() for probe in self.probes}
+        self.history.append(MemorySample(time.monotonic(), traced_bytes, sizes))
+
+        warnings = [
+            f"{probe.name} is {sizes[probe.name]}{probe.unit}, budget {probe.budget}{probe.unit}"
+            for probe in self.probes
+            if probe.budget is not None and sizes[probe.name] > probe.budget
+        ]
+
+        if self._baseline is None:
+            self._baseline = snapshot
+            return warnings
+
+        growth = traced_bytes - self.history[0].traced_bytes
+        if growth > self.growth_budget:
+            top = ", ".join(
+                f"{module} {size / 1024:+.0f} KiB" for module, size in self.growth_by_module(snapshot)[:3]
+            )
+            warnings.append(
+                f"Traced memory grew by {growth / 1024 / 1024:.1f} MiB since diagnostics started ({top})"
+            )
+        return warnings
+
+    def growth_by_module(self, snapshot: tracemalloc.Snapshot) -> list[tuple[str, int]]:
+        """Memory growth since the first sample per source file, largest first."""
+        stats = snapshot.compare_to(self._baseline, "filename")
+        return [
+            (stat.traceback[0].filename.rsplit("/", 1)[-1], stat.size_diff)
+            for stat in stats
+            if stat.size_diff > 0
+        ]
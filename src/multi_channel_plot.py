@@ -0,0 +1,220 @@
+from __future__ import annotations
+from PySide6.QtWidgets import (
+    QWidget,
+    QSplitter,
+    QListWidget,
+    QListWidgetItem,
+    QVBoxLayout,
+    QHBoxLayout,
+    QCheckBox,
+)
+from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtGui import QColor
+
+import numpy as np
+import pyqtgraph as pg
+
+from channel_buffer import ChannelBuffer
+
+pg.setConfigOption("background", "w")
+pg.setConfigOption("foreground", "k")
+
+# Channels are drawn with these pens in turn. All channels sharing a pen
+# are drawn by one curve item, so the number of scene items stays constant
+# no matter how many channels there are.
+PALETTE = [
+    (200, 200, 100),
+    (200, 0, 0),
+    (0, 100, 200),
+    (0, 160, 60),
+    (150, 0, 200),
+    (230, 120, 0),
+    (0, 170, 170),
+    (90, 90, 90),
+]
+# Width 1 cosmetic pens take Qt's fast line drawing path, wider ones are
+# stroked as polygons
+PEN_WIDTH = 1
+FRAME_INTERVAL_MS = 33
+# Points drawn per frame over all visible channels. Painting cost follows the
+# number of points, so the budget is split across the channels instead of
+# growing with them.
+MAX_POINTS = 40_000
+
+
+def batched_path(t: np.ndarray, block: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten the rows of block into one x, y pair with a connect array that
+    breaks the line between rows and around missing (NaN) values.
+    """
+    finite = np.isfinite(block)
+    connect = finite.copy()
+    connect[:, :-1] &= finite[:, 1:]
+    connect[:, -1] = False
+
+    mask = finite.ravel()
+    x = np.broadcast_to(t, block.shape).ravel()[mask]
+    y = block.ravel()[mask]
+    return x, y, connect.ravel()[mask]
+
+
+def min_max_downsample(t: np.ndarray, block: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce the columns of block to the minimum and maximum of each of bins
+    consecutive groups, two points per group, so peaks stay visible.
+    NaNs are skipped, a group with no values stays NaN.
+    """
+    edges = np.linspace(0, len(t), bins + 1).astype(np.intp)
+    starts = edges[:-1]
+    x = np.empty(2 * bins)
+    x[0::2] = t[starts]
+    x[1::2] = t[edges[1:] - 1]
+    y = np.empty((block.shape[0], 2 * bins))
+    y[:, 0::2] = np.fmin.reduceat(block, starts, axis=1)
+    y[:, 1::2] = np.fmax.reduceat(block, starts, axis=1)
+    return x, y
+
+
+class MultiChannelPlot(QWidget):
+    """
+    Plots every channel of a ChannelBuffer with a fixed number of batched
+    curve items, with a list of checkable channels to toggle visibility.
+
+    Redraws are coalesced to at most one per frame, call request_redraw
+    after adding samples. Only the visible time range is read from the
+    buffer and long ranges are reduced to a min/max envelope, so a memory-mapped buffer is only
+    paged in where the user looks.
+    """
+
+    def __init__(self, buffer: ChannelBuffer, parent=None):
+        super().__init__(parent)
+        self._buffer = buffer
+        self._dirty = False
+
+        self.plotWidget = pg.PlotWidget()
+        self._curves = []
+        for color in PALETTE:
+            pen = pg.mkPen(color, width=PEN_WIDTH, cosmetic=True)
+            curve = pg.PlotCurveItem(pen=pen, skipFiniteCheck=True)
+            self.plotWidget.addItem(curve)
+            self._curves.append(curve)
+
+        self.channelList = QListWidget()
+        self.openGlChoice = QCheckBox("OpenGL")
+        self.openGlChoice.setToolTip("Render the plot through an OpenGL viewport")
+
+        side_panel = QWidget()
+        side_layout = QVBoxLayout()
+        side_layout.setContentsMargins(0, 0, 0, 0)
+        side_layout.addWidget(self.channelList)
+        side_layout.addWidget(self.openGlChoice)
+        side_panel.setLayout(side_layout)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.plotWidget)
+        splitter.addWidget(side_panel)
+        splitter.setStretchFactor(0, 1)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(splitter)
+        self.setLayout(layout)
+
+        self._frameTimer = QTimer(self)
+        self._frameTimer.setInterval(FRAME_INTERVAL_MS)
+        self._frameTimer.timeout.connect(self.redraw)
+        self._frameTimer.start()
+
+        self.channelList.itemChanged.connect(self.handle_channel_toggled)
+        self.openGlChoice.toggled.connect(self.plotWidget.useOpenGL)
+        self.plotWidget.sigXRangeChanged.connect(self.request_redraw)
+
+        self.sync_channels()
+
+    def set_buffer(self, buffer: ChannelBuffer, hidden_channels: list[str] = ()) -> None:
+        self._buffer = buffer
+        self.channelList.clear()
+        self.sync_channels()
+        for label in hidden_channels:
+            if label in buffer.labels:
+                self.set_channel_visible(label, False)
+        self.plotWidget.enableAutoRange()
+
+    def hidden_channels(self) -> list[str]:
+        return [
+            self.channelList.item(row).text() for row in range(self.channelList.count())
+            if self.channelList.item(row).checkState() != Qt.CheckState.Checked
+        ]
+
+    def sync_channels(self) -> None:
+        """Add list entries for channels that appeared in the buffer."""
+        self.channelList.blockSignals(True)
+        for row in range(self.channelList.count(), len(self._buffer.labels)):
+            item = QListWidgetItem(self._buffer.labels[row])
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            item.setForeground(QColor(*PALETTE[row % len(PALETTE)]))
+            self.channelList.addItem(item)
+        self.channelList.blockSignals(False)
+        self._dirty = True
+
+    def visible_rows(self) -> list[int]:
+        return [
+            row for row in range(self.channelList.count())
+            if self.channelList.item(row).checkState() == Qt.CheckState.Checked
+        ]
+
+    def set_channel_visible(self, label: str, visible: bool) -> None:
+        item = self.channelList.item(self._buffer.row(label))
+        item.setCheckState(Qt.CheckState.Checked if visible else Qt.CheckState.Unchecked)
+
+    @Slot(QListWidgetItem)
+    def handle_channel_toggled(self, item: QListWidgetItem):
+        self._dirty = True
+
+    @Slot()
+    def request_redraw(self) -> None:
+        self._dirty = True
+
+    def visible_columns(self) -> tuple[int, int]:
+        """Start and stop of the samples in the visible time range."""
+        size = len(self._buffer)
+        start, stop = 0, size
+        view_box = self.plotWidget.getViewBox()
+        if size and not view_box.autoRangeEnabled()[0]:
+            x_min, x_max = view_box.viewRange()[0]
+            # One sample beyond each edge so lines reach the border
+            start = max(0, self._buffer.time_index(x_min) - 1)
+            stop = min(size, self._buffer.time_index(x_max) + 1)
+        return start, stop
+
+    def bins_per_channel(self, channels: int) -> int:
+        """Min/max groups per channel: no more than pixels, nor than the budget allows."""
+        pixels = max(1, self.plotWidget.getViewBox().width())
+        return max(1, min(int(pixels), MAX_POINTS // (2 * channels)))
+
+    @Slot()
+    def redraw(self):
+        if not self._dirty or not self.isVisible():
+            return
+        self._dirty = False
+
+        start, stop = self.visible_columns()
+        visible = self.visible_rows()
+        if not visible or stop == start:
+            for curve in self._curves:
+                curve.setData([], [])
+            return
+
+        t, block = self._buffer.columns(visible, start, stop)
+        bins = self.bins_per_channel(len(visible))
+        if len(t) > 2 * bins:
+            t, block = min_max_downsample(t, block, bins)
+
+        for color_index, curve in enumerate(self._curves):
+            positions = [i for i, row in enumerate(visible) if row % len(PALETTE) == color_index]
+            if not positions:
+                curve.setData([], [])
+                continue
+            x, y, connect = batched_path(t, block[positions])
+            curve.setData(x=x, y=y, connect=connect)
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from typing import Callable
+
+from serial_port import SerialPort, SerialPortSettings
+
+PortFactory = Callable[[str, SerialPortSettings], SerialPort]
+
+
+class PortPool:
+    """
+    Keeps the most recently used ports open so that switching back to a
+    device does not have to open and configure it again.
+
+    Ports that fall out of the pool are closed.
+    """
+
+    def __init__(self, factory: PortFactory, max_size: int = 4):
+        self._factory = factory
+        self._max_size = max_size
+        self._ports: OrderedDict[str, SerialPort] = OrderedDict()
+
+    def acquire(self, port_id: str, settings: SerialPortSettings) -> SerialPort:
+        """Take a port out of the pool, or open it if it is not pooled."""
+        port = self._ports.pop(port_id, None)
+        if port is not None:
+            try:
+                reusable = port.apply_settings(settings)
+            except Exception:
+                port.close()
+                raise
+            if reusable:
+                # Drop whatever arrived while the port was not displayed
+                port.reset_input_buffer()
+                return port
+            port.close()
+        return self._factory(port_id, settings)
+
+    def release(self, port_id: str, port: SerialPort) -> None:
+        """Put a port that is no longer in use back into the pool."""
+        self._ports[port_id] = port
+        self._ports.move_to_end(port_id)
+        while len(self._ports) > self._max_size:
+            _, oldest = self._ports.popitem(last=False)
+            oldest.close()
+
+    def __len__(self) -> int:
+        return len(self._ports)
+
+    def close_all(self) -> None:
+        while self._ports:
+            _, port = self._ports.popitem()
+            port.close()
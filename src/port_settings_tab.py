@@ -21,6 +21,7 @@ from serial_port import (
     ParityChecking,
     StopBits,
     ReadingMode,
+    TextEncoding,
 )
 
 class OptionalDoubleSpinBox(QWidget):
@@ -110,6 +111,11 @@ class PortSettingsWidget(QWidget):
             [str(v.value) for v in ReadingMode]
         )
 
+        self.encoding_choice = QComboBox()
+        self.encoding_choice.addItems(
+            [str(v.value) for v in TextEncoding]
+        )
+
         self.baudrate_choice = QComboBox()
         self.baudrate_choice.addItems(
             [str(v) for v in StandardBaudRates]
@@ -142,13 +148,24 @@ class PortSettingsWidget(QWidget):
 
         self.inter_byte_timeout_choice = OptionalDoubleSpinBox("Enable")
 
+        self.adaptive_reads_choice = QCheckBox("Enable")
+        self.adaptive_reads_choice.setToolTip(
+            "Size reads and tune the read timeout from the data rate, "
+            "the timeout setting is not used"
+        )
+
         self.exclusive_choice = TriStateCheckbox("Enable")
 
+        self.tx_rate_limit_choice = OptionalDoubleSpinBox("Enable")
+        self.tx_rate_limit_choice.spinbox.setRange(1.0, 10_000_000.0)
+        self.tx_rate_limit_choice.spinbox.setDecimals(0)
+
         self.update_ui_values()
 
         # Set the layout
         form_layout = QFormLayout()
         form_layout.addRow("Reading mode", self.reading_mode_choice)
+        form_layout.addRow("Text encoding", self.encoding_choice)
         form_layout.addRow("Baud rate", self.baudrate_choice)
         form_layout.addRow("Data bits", self.bytesize_choice)
         form_layout.addRow("Parity checking", self.parity_choice)
@@ -159,7 +176,9 @@ class PortSettingsWidget(QWidget):
         form_layout.addRow("Hardware DSR/DTR", self.dsrdtr_choice)
         form_layout.addRow("Write timeout", self.write_timeout_choice)
         form_layout.addRow("Inter byte timeout", self.inter_byte_timeout_choice)
+        form_layout.addRow("Adaptive reads", self.adaptive_reads_choice)
         form_layout.addRow("Exclusive", self.exclusive_choice)
+        form_layout.addRow("TX rate limit (B/s)", self.tx_rate_limit_choice)
 
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
@@ -169,6 +188,7 @@ class PortSettingsWidget(QWidget):
     def get_settings(self): 
         return SerialPortSettings(
             reading_mode=ReadingMode(self.reading_mode_choice.currentText()),
+            encoding=TextEncoding(self.encoding_choice.currentText()),
             baudrate=StandardBaudRates(int(self.baudrate_choice.currentText())),
             bytesize=DataBits(int(self.bytesize_choice.currentText())),
             parity=ParityChecking[self.parity_choice.currentText().upper()],
@@ -179,7 +199,9 @@ class PortSettingsWidget(QWidget):
             write_timeout=self.write_timeout_choice.value(),
             dsrdtr=self.dsrdtr_choice.isChecked(),
             inter_byte_timeout=self.inter_byte_timeout_choice.value(),
+            adaptive_reads=self.adaptive_reads_choice.isChecked(),
             exclusive=self.exclusive_choice.value(),
+            tx_rate_limit=self.tx_rate_limit_choice.value(),
         )
 
     @Slot()
@@ -191,6 +213,9 @@ class PortSettingsWidget(QWidget):
         self.reading_mode_choice.setCurrentText(
             self.settings.reading_mode.value,
         )
+        self.encoding_choice.setCurrentText(
+            self.settings.encoding.value,
+        )
         self.baudrate_choice.setCurrentText(
             str(self.settings.baudrate)
         )
@@ -209,7 +234,9 @@ class PortSettingsWidget(QWidget):
         self.dsrdtr_choice.setChecked(self.settings.dsrdtr)
         self.write_timeout_choice.setValue(self.settings.write_timeout)
         self.inter_byte_timeout_choice.setValue(self.settings.inter_byte_timeout)
+        self.adaptive_reads_choice.setChecked(self.settings.adaptive_reads)
         self.exclusive_choice.setValue(self.settings.exclusive)
+        self.tx_rate_limit_choice.setValue(self.settings.tx_rate_limit)
 
 
 def save_serial_settings(settings: QSettings, config: SerialPortSettings):
@@ -218,6 +245,7 @@ def save_serial_settings(settings: QSettings, config: SerialPortSettings):
     settings.beginGroup("serial_port")
     
     settings.setValue("reading_mode", config.reading_mode.value)
+    settings.setValue("encoding", config.encoding.value)
     settings.setValue("baudrate", config.baudrate.value)
     settings.setValue("bytesize", config.bytesize.value)
     settings.setValue("parity", config.parity.value)
@@ -228,7 +256,9 @@ def save_serial_settings(settings: QSettings, config: SerialPortSettings):
     settings.setValue("write_timeout", config.write_timeout)
     settings.setValue("dsrdtr", config.dsrdtr)
     settings.setValue("inter_byte_timeout", config.inter_byte_timeout)
+    settings.setValue("adaptive_reads", config.adaptive_reads)
     settings.setValue("exclusive", config.exclusive)
+    settings.setValue("tx_rate_limit", config.tx_rate_limit)
     
     settings.endGroup()
     print("Settings saved.")
@@ -247,9 +277,11 @@ def load_serial_settings(settings: QSettings) -> SerialPortSettings:
     write_timeout = settings.value("write_timeout", default.write_timeout)
     inter_byte_timeout = settings.value("inter_byte_timeout", default.inter_byte_timeout)
     exclusive = settings.value("exclusive", default.exclusive)
+    tx_rate_limit = settings.value("tx_rate_limit", default.tx_rate_limit)
 
     config = SerialPortSettings(
         reading_mode=ReadingMode(settings.value("reading_mode", default.reading_mode.value)),
+        encoding=TextEncoding(settings.value("encoding", default.encoding.value)),
         baudrate=StandardBaudRates(int(settings.value("baudrate", default.baudrate))),
         bytesize=DataBits(int(settings.value("bytesize", default.bytesize))),
         parity=ParityChecking(settings.value("parity", default.parity)),
@@ -260,7 +292,9 @@ def load_serial_settings(settings: QSettings) -> SerialPortSettings:
         write_timeout=float(write_timeout) if write_timeout is not None else None,
         dsrdtr=settings.value("dsrdtr", default.dsrdtr, type=bool),
         inter_byte_timeout=float(inter_byte_timeout) if inter_byte_timeout is not None else None,
-        exclusive=bool(exclusive) if exclusive is not None else None
+        adaptive_reads=settings.value("adaptive_reads", default.adaptive_reads, type=bool),
+        exclusive=bool(exclusive) if exclusive is not None else None,
+        tx_rate_limit=float(tx_rate_limit) if tx_rate_limit is not None else None,
     )
     settings.endGroup()
     print("Settings loaded.")
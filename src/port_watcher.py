@@ -0,0 +1,83 @@
+from PySide6.QtCore import QThread, Signal, Slot
+
+import os
+import sys
+import time
+
+# Every tty device (including USB-serial adapters) has an entry here, so the
+# directory listing changes whenever a device is plugged in or removed
+SYSFS_TTY_DIR = "/sys/class/tty"
+
+
+def hotplug_fingerprint() -> frozenset[str] | None:
+    """
+    Return a cheap summary of the present tty devices, or None if the
+    platform offers no cheap way to detect changes.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return frozenset(os.listdir(SYSFS_TTY_DIR))
+    except OSError:
+        return None
+
+
+class PortWatcher(QThread):
+    """
+    Enumerates serial ports in the background and emits the list of
+    ListPortInfo objects whenever the set of available devices changes.
+
+    On Linux the (slow) enumeration only runs when the sysfs tty directory
+    changes, on other platforms it runs on every poll.
+    """
+
+    ports_changed = Signal(list)
+
+    def __init__(self, poll_interval: float = 1.0):
+        super().__init__()
+        self._poll_interval = poll_interval
+        self._shutdown_rq = False
+        self._refresh_rq = True
+        self._fingerprint = None
+        self._ports = {}
+
+    def run(self):
+        import serial.tools.list_ports
+
+        while not self._shutdown_rq:
+            fingerprint = hotplug_fingerprint()
+
+            if self._refresh_rq or fingerprint is None or fingerprint != self._fingerprint:
+                forced = self._refresh_rq
+                self._refresh_rq = False
+                self._fingerprint = fingerprint
+
+                ports = {
+                    port_info.device: port_info
+                    for port_info in serial.tools.list_ports.comports()
+                }
+                if forced or self._port_keys(ports) != self._port_keys(self._ports):
+                    self._ports = ports
+                    self.ports_changed.emit(self.ports())
+
+            deadline = time.monotonic() + self._poll_interval
+            while time.monotonic() < deadline:
+                if self._shutdown_rq or self._refresh_rq:
+                    break
+                time.sleep(0.05)
+
+    @staticmethod
+    def _port_keys(ports: dict) -> set[tuple[str, str | None]]:
+        return {(device, info.serial_number) for device, info in ports.items()}
+
+    def ports(self) -> list:
+        """The cached result of the last enumeration, sorted by device name."""
+        return sorted(self._ports.values(), key=lambda port_info: port_info.device)
+
+    @Slot()
+    def refresh(self):
+        self._refresh_rq = True
+
+    @Slot()
+    def shutdown(self):
+        self._shutdown_rq = True
@@ -7,13 +7,33 @@ import time
 
 import serial
 
+from adaptive_reader import AdaptiveReader, ReadStats
+
 class SerialPort(ABC):
 
     @abstractmethod
     def read(self) -> bytes: ...
 
     @abstractmethod
-    def send(self, line: str) -> None: ...
+    def write(self, data: bytes | memoryview) -> int:
+        """Write the data and return the number of bytes written."""
+
+    @abstractmethod
+    def apply_settings(self, settings: SerialPortSettings) -> bool:
+        """
+        Reconfigure the open port in place.
+        Returns False if the settings can only be applied by reopening the port.
+        """
+
+    @abstractmethod
+    def reset_input_buffer(self) -> None: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+    def read_stats(self) -> ReadStats | None:
+        """Read sizing statistics, if the port collects them."""
+        return None
 
 
 class StandardBaudRates(IntEnum):
@@ -84,6 +104,13 @@ class ReadingMode(Enum):
     READ_BYTE = "Read byte"
 
 
+class TextEncoding(Enum):
+    UTF8 = "utf-8"
+    LATIN1 = "latin-1"
+    ASCII = "ascii"
+    RAW = "raw"
+
+
 @dataclass
 class SerialPortSettings:
     """
@@ -92,6 +119,10 @@ class SerialPortSettings:
     Attributes:
         reading_mode (str)
             Describes whether the port will return data after a newline or after every byte
+
+        encoding (TextEncoding)
+            How received bytes are shown in the text view, RAW shows them as hex.
+            Data is passed on as bytes, only the text view decodes it.
          
         baudrate (int): 
             The baud rate for the connection. Common values include 9600, 19200, 115200, etc.
@@ -129,13 +160,22 @@ class SerialPortSettings:
         inter_byte_timeout (float | None): 
             Inter-character timeout in seconds. 
             Use None to disable.
+
+        adaptive_reads (bool):
+            Size reads and tune the read timeout from the observed data rate.
+            The timeout setting is ignored while this is enabled.
         
         exclusive (bool | None): 
             Set exclusive access mode to the port. 
             Not all platforms support this. Use None to leave at default behavior.
+
+        tx_rate_limit (float | None):
+            Maximum transmit rate in bytes per second.
+            Use None to send as fast as the port accepts data.
     """
 
     reading_mode: ReadingMode
+    encoding: TextEncoding
     baudrate: StandardBaudRates
     bytesize: DataBits
     parity: ParityChecking
@@ -146,12 +186,15 @@ class SerialPortSettings:
     write_timeout: float | None
     dsrdtr: bool
     inter_byte_timeout: float | None
+    adaptive_reads: bool
     exclusive: bool | None
+    tx_rate_limit: float | None
 
     @staticmethod
     def default() -> SerialPortSettings:
         return SerialPortSettings(
             reading_mode=ReadingMode.READ_LINE,
+            encoding=TextEncoding.UTF8,
             baudrate=StandardBaudRates.B9600,
             bytesize=DataBits.EIGHT,
             parity=ParityChecking.NONE,
@@ -162,42 +205,101 @@ class SerialPortSettings:
             write_timeout=None,
             dsrdtr=False,
             inter_byte_timeout=None,
+            adaptive_reads=True,
             exclusive=None,
+            tx_rate_limit=None,
         )
 
 
+def reconfigurable_settings(settings: SerialPortSettings) -> dict:
+    """
+    The settings that pyserial can change on an already open port,
+    in the format of serial.Serial.apply_settings.
+    """
+    return {
+        "baudrate": settings.baudrate.value,
+        "bytesize": settings.bytesize.value,
+        "parity": settings.parity.value,
+        "stopbits": settings.stopbits.value,
+        "timeout": settings.timeout,
+        "xonxoff": settings.xonxoff,
+        "rtscts": settings.rtscts,
+        "write_timeout": settings.write_timeout,
+        "dsrdtr": settings.dsrdtr,
+        "inter_byte_timeout": settings.inter_byte_timeout,
+    }
+
+
 class RealSerialPort(SerialPort):
 
     def __init__(self, port: str, settings: SerialPortSettings) -> None:
+        self._settings = settings
         self._reading_mode = settings.reading_mode
         self._port = serial.Serial(
             port=port,
-            baudrate=settings.baudrate,
-            bytesize=settings.bytesize.value,
-            parity=settings.parity.value,
-            stopbits=settings.stopbits.value,
-            timeout=settings.timeout,
-            xonxoff=settings.xonxoff,
-            rtscts=settings.rtscts,
-            write_timeout=settings.write_timeout,
-            dsrdtr=settings.dsrdtr,
-            inter_byte_timeout=settings.inter_byte_timeout,
             exclusive=settings.exclusive,
+            **reconfigurable_settings(settings),
         )
+        self._adaptive_reader = AdaptiveReader(self._port) if settings.adaptive_reads else None
 
     def set_port(self, port: str) -> None:
         """ Will open the port with the new setting """
         self._port.port = port
 
     def read(self) -> bytes:
+        if self._adaptive_reader is not None:
+            match self._reading_mode:
+                case ReadingMode.READ_BYTE:
+                    return self._adaptive_reader.read_chunk()
+                case ReadingMode.READ_LINE:
+                    return self._adaptive_reader.read_line()
+
         match self._reading_mode:
             case ReadingMode.READ_BYTE:
                 return self._port.read(size=1)
             case ReadingMode.READ_LINE:
                 return self._port.readline()
+
+    def read_stats(self) -> ReadStats | None:
+        if self._adaptive_reader is None:
+            return None
+        return self._adaptive_reader.stats()
     
-    def send(self, line: str) -> None:
-        self._port.write(line.encode())
+    def write(self, data: bytes | memoryview) -> int:
+        return self._port.write(data)
+
+    def apply_settings(self, settings: SerialPortSettings) -> bool:
+        # The exclusive lock is taken when the port is opened
+        if settings.exclusive != self._settings.exclusive:
+            return False
+
+        previous = self._port.get_settings()
+        port_settings = reconfigurable_settings(settings)
+        if settings.adaptive_reads and self._adaptive_reader is not None:
+            # The reader owns the timeout
+            port_settings["timeout"] = self._adaptive_reader.timeout
+        try:
+            self._port.apply_settings(port_settings)
+        except ValueError:
+            # pyserial rejects some values only when configuring the port,
+            # keep it usable with the settings it had
+            self._port.apply_settings(previous)
+            raise
+
+        if settings.adaptive_reads:
+            if self._adaptive_reader is None:
+                self._adaptive_reader = AdaptiveReader(self._port)
+        else:
+            self._adaptive_reader = None
+        self._settings = settings
+        self._reading_mode = settings.reading_mode
+        return True
+
+    def reset_input_buffer(self) -> None:
+        self._port.reset_input_buffer()
+
+    def close(self) -> None:
+        self._port.close()
     
 
 class FakeSerialPort(SerialPort):
@@ -219,5 +321,17 @@ class FakeSerialPort(SerialPort):
                 # return f"{random.randint(10, 40)}\n".encode()
                 return f'{{"x": {random.randint(20, 50)}, "y": {random.randint(0, 20)}}}\n'.encode()
     
-    def send(self, line: str) -> None:
-        print(line.encode())
+    def write(self, data: bytes | memoryview) -> int:
+        print(bytes(data))
+        return len(data)
+
+    def apply_settings(self, settings: SerialPortSettings) -> bool:
+        self._settings = settings
+        return True
+
+    def reset_input_buffer(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
@@ -1,37 +1,142 @@
 from PySide6.QtCore import QThread, Signal, Slot
 from queue import Queue
+from typing import Callable
 
 import time
-from serial_port import SerialPort
+import serial.serialutil
+from serial_port import SerialPort, SerialPortSettings, TextEncoding
+from text_decoder import encode_text
+from port_pool import PortPool, PortFactory
+from serial_writer import SerialWriter
+from latency import LatencyTracker
+
+STATS_INTERVAL = 1.0
 
 class SerialThread(QThread):
+    """
+    Reads from the current port and owns its whole lifecycle.
+    Ports are opened, reconfigured and closed on this thread only,
+    requests from the GUI are queued with open_port.
+    Outgoing data is handled by the SerialWriter in self.writer.
+    """
+
+    # Raw bytes as read from the port, decoding is left to the views
+    new_data = Signal(object)
+    port_error = Signal(str)
+    port_opened = Signal(str)
+    port_open_failed = Signal(str, str)
+    read_stats = Signal(object)
 
-    new_data = Signal(str)
-    
-    def __init__(self, port: SerialPort):
+    def __init__(self, port_factory: PortFactory):
         super().__init__()
-        self._port = port
+        self._pool = PortPool(port_factory)
+        self._port: SerialPort | None = None
+        self._port_id: str | None = None
+        # Of the last applied settings, used for lines sent from the GUI
+        self._encoding = TextEncoding.UTF8
         self._shutdown_rq = False
         self._pause_rq = False
         self._is_paused = False
-        self._lines_to_send = Queue()
+        self._port_requests = Queue()
+        self.writer = SerialWriter()
+        self._latency_tracker: LatencyTracker | None = None
+        self._publish: Callable[[bytes], None] | None = None
+        self._last_stats = time.monotonic()
 
     def run(self):
+        self.writer.start()
+
         while not self._shutdown_rq:
 
-            while self._pause_rq:
+            while self._pause_rq and not self._shutdown_rq:
                 self._is_paused = True
-                if self._shutdown_rq:
-                    return
                 time.sleep(0.1)
 
             self._is_paused = False
 
-            while not self._lines_to_send.empty():
-                self._port.send(self._lines_to_send.get())
+            if self._shutdown_rq:
+                break
+
+            self._handle_port_requests()
+
+            if self._port is None:
+                time.sleep(0.1)
+                continue
+
+            try:
+                byte = self._port.read()
+                if self._latency_tracker is not None:
+                    self._latency_tracker.record_received(byte, time.perf_counter())
+            except serial.serialutil.SerialException as e:
+                # Typically the device was unplugged, wait for a new port
+                self._close_port()
+                self._pause_rq = True
+                self.port_error.emit(str(e))
+                continue
+
+            if byte:
+                self.new_data.emit(byte)
+                # Read once, the GUI thread may remove the publisher meanwhile
+                publish = self._publish
+                if publish is not None:
+                    publish(byte)
+
+            if time.monotonic() - self._last_stats >= STATS_INTERVAL:
+                self._last_stats = time.monotonic()
+                stats = self._port.read_stats()
+                if stats is not None:
+                    self.read_stats.emit(stats)
+
+        self.writer.shutdown()
+        self.writer.wait()
+        self._close_port()
+        self._pool.close_all()
 
-            byte = self._port.read()
-            self.new_data.emit(byte.decode(errors="replace"))
+    def _handle_port_requests(self):
+        while not self._port_requests.empty():
+            port_id, settings = self._port_requests.get()
+            try:
+                if port_id == self._port_id:
+                    self._reconfigure_port(settings)
+                else:
+                    self._switch_port(port_id, settings)
+            except (serial.serialutil.SerialException, ValueError) as e:
+                # pyserial raises ValueError for settings it cannot apply,
+                # e.g. an unsupported baud rate
+                self.port_open_failed.emit(port_id, str(e))
+            else:
+                self.port_opened.emit(port_id)
+
+    def _reconfigure_port(self, settings: SerialPortSettings):
+        if self._port.apply_settings(settings):
+            self._encoding = settings.encoding
+            self.writer.set_port(self._port, settings)
+            return
+        port_id = self._port_id
+        self._close_port()
+        self._set_port(self._pool.acquire(port_id, settings), port_id, settings)
+
+    def _switch_port(self, port_id: str, settings: SerialPortSettings):
+        # The old port is kept until the new one has been opened successfully
+        new_port = self._pool.acquire(port_id, settings)
+        if self._port is not None:
+            self._pool.release(self._port_id, self._port)
+        self._set_port(new_port, port_id, settings)
+
+    def _set_port(self, port: SerialPort | None, port_id: str | None, settings: SerialPortSettings | None):
+        self._port = port
+        self._port_id = port_id
+        if settings is not None:
+            self._encoding = settings.encoding
+        self.writer.set_port(port, settings)
+
+    def _close_port(self):
+        if self._port is not None:
+            try:
+                self._port.close()
+            except serial.serialutil.SerialException:
+                pass
+        self._set_port(None, None, None)
 
     @Slot()
     def shutdown(self):
@@ -42,14 +147,33 @@ class SerialThread(QThread):
         self._pause_rq = True
 
     @Slot()
-    def resume(self, new_port: SerialPort | None):
-        if new_port is not None:
-            self._port = new_port
+    def resume(self):
         self._pause_rq = False
 
+    def open_port(self, port_id: str, settings: SerialPortSettings):
+        """
+        Switch to port_id, or apply the settings in place if it is already
+        the current port. Resumes reading. The result is reported with
+        port_opened or port_open_failed.
+        """
+        self._port_requests.put((port_id, settings))
+        self._pause_rq = False
+
+    def set_latency_tracker(self, tracker: LatencyTracker | None):
+        """Start (or with None stop) matching sent lines with replies."""
+        self._latency_tracker = tracker
+        self.writer.latency_tracker = tracker
+
+    def set_publisher(self, publish: Callable[[bytes], None] | None):
+        """Also pass everything read to publish (e.g. StreamServer.publish), None stops."""
+        self._publish = publish
+
     @Slot(str)
     def send_line(self, line: str):
-        self._lines_to_send.put(line)
+        self.writer.send(encode_text(line, self._encoding))
+
+    def pooled_ports(self) -> int:
+        return len(self._pool)
 
     def is_paused(self) -> bool:
-        return self._is_paused
\ No newline at end of file
+        return self._is_paused
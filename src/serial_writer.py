@@ -0,0 +1,247 @@
+from __future__ import annotations
+from PySide6.QtCore import QThread, Signal, Slot
+from dataclasses import dataclass
+from queue import Queue, Empty
+import mmap
+import threading
+import time
+
+import serial.serialutil
+from serial_port import SerialPort, SerialPortSettings
+from latency import LatencyTracker
+
+# Upper bound of a single write call, keeps write_timeout meaningful
+# and lets a port switch or cancel take effect quickly
+MAX_CHUNK_SIZE = 4096
+STATS_INTERVAL = 1.0
+
+
+class TransferCancelled(Exception):
+    """The current job was cancelled with SerialWriter.cancel or by shutdown."""
+
+
+@dataclass
+class FileJob:
+    """Stream the contents of a file, e.g. a firmware image."""
+    path: str
+
+
+@dataclass
+class ScriptJob:
+    """Send a file line by line, waiting line_delay seconds after each line."""
+    path: str
+    line_ending: bytes
+    line_delay: float
+
+
+class SerialWriter(QThread):
+    """
+    Services all outgoing data independently of the reader.
+
+    Consecutive small sends are coalesced into a single write, files are
+    streamed from a memory map in chunks without copying and the
+    transmission rate is limited to SerialPortSettings.tx_rate_limit.
+
+    Jobs are queued together with the cancel generation they were sent in.
+    cancel only advances the generation, the writer thread then skips the
+    queued jobs and aborts the current one, so no writer state is touched
+    from the GUI thread.
+    """
+
+    tx_stats = Signal(float, int)  # bytes per second, total bytes
+    write_error = Signal(str)
+    job_finished = Signal(str)
+    job_cancelled = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self._port: SerialPort | None = None
+        self._rate_limit: float | None = None
+        self._port_lock = threading.Lock()
+        self._jobs = Queue()
+        self._pending = None
+        self._shutdown_rq = False
+        self._generation = 0
+        self._job_generation = 0
+        # Set by cancel and shutdown to cut a script's line delay short
+        self._wake = threading.Event()
+        self._total_bytes = 0
+        self._stats_bytes = 0
+        self._stats_start = time.monotonic()
+        # Pacing state of the rate limiter
+        self._pace_start = time.monotonic()
+        self._pace_bytes = 0
+        self.latency_tracker: LatencyTracker | None = None
+
+    def run(self):
+        while not self._shutdown_rq:
+            job = self._next_job()
+            if job is None:
+                self._emit_stats()
+                continue
+
+            try:
+                match job:
+                    case list():
+                        # Recorded per send call, which is one command
+                        # when no line ending is used
+                        for data in job:
+                            self._record_sent(data)
+                        self._write_all(memoryview(b"".join(job)))
+                    case FileJob():
+                        self._send_file(job)
+                        self.job_finished.emit(job.path)
+                    case ScriptJob():
+                        self._send_script(job)
+                        self.job_finished.emit(job.path)
+            except TransferCancelled:
+                if not isinstance(job, list):
+                    self.job_cancelled.emit(job.path)
+            except serial.serialutil.SerialTimeoutException:
+                self.write_error.emit("Write timeout")
+            except (serial.serialutil.SerialException, OSError) as e:
+                self.write_error.emit(str(e))
+
+            self._emit_stats()
+
+    def _next_job(self):
+        """
+        Take the next job from the queue. Consecutive byte sends are joined
+        into one job, a list of the sent data.
+        """
+        if self._pending is not None:
+            item, self._pending = self._pending, None
+        else:
+            try:
+                item = self._jobs.get(timeout=0.1)
+            except Empty:
+                return None
+
+        # Cleared before the check, a cancel from now on wakes the job up
+        self._wake.clear()
+        generation, job = item
+        if generation != self._generation:
+            # Cancelled while queued
+            if not isinstance(job, bytes):
+                self.job_cancelled.emit(job.path)
+            return None
+        self._job_generation = generation
+
+        if not isinstance(job, bytes):
+            return job
+
+        batch = [job]
+        size = len(job)
+        while size < MAX_CHUNK_SIZE:
+            try:
+                item = self._jobs.get_nowait()
+            except Empty:
+                break
+            if item[0] != generation or not isinstance(item[1], bytes):
+                self._pending = item
+                break
+            batch.append(item[1])
+            size += len(item[1])
+        return batch
+
+    def _check_cancelled(self):
+        if self._job_generation != self._generation or self._shutdown_rq:
+            raise TransferCancelled()
+
+    def _send_file(self, job: FileJob):
+        with open(job.path, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return  # Empty file
+            with mapped, memoryview(mapped) as data:
+                self._write_all(data)
+
+    def _send_script(self, job: ScriptJob):
+        with open(job.path, "rb") as f:
+            for line in f:
+                self._check_cancelled()
+                line = line.rstrip(b"\r\n") + job.line_ending
+                self._record_sent(line)
+                self._write_all(memoryview(line))
+                if job.line_delay > 0:
+                    self._wake.wait(job.line_delay)
+
+    def _write_all(self, data: memoryview):
+        chunk_size = MAX_CHUNK_SIZE
+        if self._rate_limit is not None:
+            # Roughly 20 writes per second keeps the pacing smooth
+            chunk_size = max(1, min(MAX_CHUNK_SIZE, int(self._rate_limit / 20)))
+
+        offset = 0
+        while offset < len(data):
+            self._check_cancelled()
+            with self._port_lock:
+                port = self._port
+            if port is None:
+                raise serial.serialutil.SerialException("Port is not open")
+            written = port.write(data[offset:offset + chunk_size])
+            if not written:
+                raise serial.serialutil.SerialTimeoutException("Write timeout")
+
+            offset += written
+            self._total_bytes += written
+            self._stats_bytes += written
+            self._pace(written)
+            if time.monotonic() - self._stats_start >= STATS_INTERVAL:
+                self._emit_stats()
+
+    def _record_sent(self, data: bytes):
+        # Recorded before writing, a fast device may reply before write returns
+        tracker = self.latency_tracker
+        if tracker is not None:
+            tracker.record_sent(data, time.perf_counter())
+
+    def _pace(self, written: int):
+        if self._rate_limit is None:
+            return
+        now = time.monotonic()
+        # Restart the schedule after idle periods so they are not "saved up"
+        if now - self._pace_start > self._pace_bytes / self._rate_limit + 1.0:
+            self._pace_start = now
+            self._pace_bytes = 0
+        self._pace_bytes += written
+        ahead = self._pace_bytes / self._rate_limit - (now - self._pace_start)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def _emit_stats(self):
+        elapsed = time.monotonic() - self._stats_start
+        if elapsed < STATS_INTERVAL:
+            return
+        self.tx_stats.emit(self._stats_bytes / elapsed, self._total_bytes)
+        self._stats_bytes = 0
+        self._stats_start = time.monotonic()
+
+    def set_port(self, port: SerialPort | None, settings: SerialPortSettings | None = None):
+        with self._port_lock:
+            self._port = port
+            self._rate_limit = settings.tx_rate_limit if settings is not None else None
+
+    def queued_jobs(self) -> int:
+        return self._jobs.qsize()
+
+    def send(self, data: bytes):
+        self._jobs.put((self._generation, bytes(data)))
+
+    def send_file(self, path: str):
+        self._jobs.put((self._generation, FileJob(path)))
+
+    def send_script(self, path: str, line_ending: bytes, line_delay: float):
+        self._jobs.put((self._generation, ScriptJob(path, line_ending, line_delay)))
+
+    @Slot()
+    def cancel(self):
+        """Abort the current transfer and drop everything that is queued."""
+        self._generation += 1
+        self._wake.set()
+
+    @Slot()
+    def shutdown(self):
+        self._shutdown_rq = True
+        self._wake.set()
@@ -0,0 +1,190 @@
+"""
+Session snapshots: port settings, plot samples and received text.
+
+A snapshot is a directory holding the sample block and the text as plain
+binary files. They are memory-mapped when the session is opened, so only
+the pages that are actually displayed are read from disk.
+
+    session.ini       port settings and channel setup (QSettings INI format)
+    t.npy             sample times
+    values.npy        channel samples, one row per channel, stored column by column
+    text.bin          received text, UTF-8
+    text_index.npy    byte offset of the start of every text line
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable
+import os
+
+import numpy as np
+from PySide6.QtCore import QSettings
+
+from channel_buffer import ChannelBuffer, ITEM_SIZE
+from port_settings_tab import save_serial_settings, load_serial_settings
+from serial_port import SerialPortSettings
+
+SESSION_SUFFIX = ".svsession"
+# Restored samples are copied to a new snapshot in pieces of about this size
+SAVE_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+class SessionText:
+    """Memory-mapped received text with random access by line."""
+
+    def __init__(self, data: np.ndarray, index: np.ndarray) -> None:
+        self._data = data
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lines(self, start: int, stop: int) -> str:
+        start = max(0, start)
+        stop = min(stop, len(self._index))
+        if start >= stop:
+            return ""
+        begin = self._index[start]
+        end = self._index[stop] if stop < len(self._index) else len(self._data)
+        return self._data[begin:end].tobytes().decode(errors="replace")
+
+    def tail(self, count: int) -> str:
+        return self.lines(len(self) - count, len(self))
+
+    def nbytes(self) -> int:
+        return len(self._data)
+
+    def ends_with_newline(self) -> bool:
+        return len(self._data) == 0 or self._data[-1] == ord("\n")
+
+
+@dataclass
+class Session:
+    settings: SerialPortSettings
+    plot_data: ChannelBuffer
+    hidden_channels: list[str]
+    text: SessionText
+
+
+def line_index(text: bytes) -> np.ndarray:
+    """Byte offsets at which the lines of text start."""
+    raw = np.frombuffer(text, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord("\n")) + 1
+    return np.concatenate([[0], newlines[newlines < len(raw)]]).astype(np.int64)
+
+
+def save_session(
+    path: str,
+    settings: SerialPortSettings,
+    plot_data: ChannelBuffer | None,
+    hidden_channels: list[str],
+    text: str,
+    restored_text: SessionText | None = None,
+) -> Path:
+    """
+    Write a snapshot to path. With restored_text, text is what was received
+    after restoring and the snapshot holds the whole restored text before it.
+    The restored samples of plot_data are written the same way.
+
+    Files are written under a temporary name and then renamed, the session
+    being replaced may be the one whose files are memory-mapped.
+    """
+    directory = Path(path)
+    if directory.suffix != SESSION_SUFFIX:
+        directory = directory.with_name(directory.name + SESSION_SUFFIX)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    ini = QSettings(str(directory / "session.ini"), QSettings.Format.IniFormat)
+    save_serial_settings(ini, settings)
+    ini.beginGroup("plot")
+    ini.setValue("labels", plot_data.labels if plot_data is not None else [])
+    ini.setValue("hidden", hidden_channels)
+    ini.endGroup()
+    ini.sync()
+
+    if plot_data is None:
+        plot_data = ChannelBuffer(capacity=0)
+    write_replacing(directory / "t.npy", lambda f: write_columns(f, plot_data, with_values=False))
+    write_replacing(directory / "values.npy", lambda f: write_columns(f, plot_data, with_values=True))
+
+    encoded = text.encode()
+    index = line_index(encoded)
+    if restored_text is not None and restored_text.nbytes() > 0:
+        if encoded and not restored_text.ends_with_newline():
+            encoded = b"\n" + encoded  # Received text starts on a new line
+            index = line_index(encoded)[1:]
+        elif not encoded:
+            index = index[:0]
+        index = np.concatenate([restored_text._index, index + restored_text.nbytes()])
+
+    def write_text(f: BinaryIO) -> None:
+        if restored_text is not None:
+            f.write(restored_text._data)
+        f.write(encoded)
+
+    write_replacing(directory / "text.bin", write_text)
+    write_replacing(directory / "text_index.npy", lambda f: np.save(f, index))
+    return directory
+
+
+def write_columns(f: BinaryIO, plot_data: ChannelBuffer, with_values: bool) -> None:
+    """
+    Write the sample times, or with_values the sample block, as .npy a few
+    columns at a time. The block is stored in Fortran order so that
+    consecutive columns are consecutive in the file.
+    """
+    rows = range(len(plot_data.labels))
+    shape = (len(rows), len(plot_data)) if with_values else (len(plot_data),)
+    np.lib.format.write_array_header_1_0(f, {
+        "descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)),
+        "fortran_order": with_values,
+        "shape": shape,
+    })
+    step = max(1, SAVE_CHUNK_BYTES // (ITEM_SIZE * (len(rows) + 1)))
+    for start in range(0, len(plot_data), step):
+        t, values = plot_data.columns(rows if with_values else [], start, min(len(plot_data), start + step))
+        f.write((values if with_values else t).tobytes(order="F"))
+
+
+def write_replacing(path: Path, write: Callable[[BinaryIO], None]) -> None:
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+def load_session(path: str) -> Session:
+    directory = Path(path)
+
+    ini = QSettings(str(directory / "session.ini"), QSettings.Format.IniFormat)
+    settings = load_serial_settings(ini)
+    ini.beginGroup("plot")
+    # QSettings returns a plain string for single element lists
+    labels = as_list(ini.value("labels", []))
+    hidden = as_list(ini.value("hidden", []))
+    ini.endGroup()
+
+    t = np.load(directory / "t.npy", mmap_mode="r")
+    values = np.load(directory / "values.npy", mmap_mode="r")
+
+    text_path = directory / "text.bin"
+    if text_path.stat().st_size > 0:
+        text_data = np.memmap(text_path, dtype=np.uint8, mode="r")
+    else:
+        text_data = np.empty(0, dtype=np.uint8)  # Empty files cannot be mapped
+    text_index = np.load(directory / "text_index.npy", mmap_mode="r")
+
+    return Session(
+        settings=settings,
+        plot_data=ChannelBuffer.from_arrays(labels, t, values),
+        hidden_channels=hidden,
+        text=SessionText(text_data, text_index),
+    )
+
+
+def as_list(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
@@ -0,0 +1,182 @@
+"""
+Memory soak test: runs a simulated day of device output through the whole
+receive path (SerialThread, PortPool, AdaptiveReader, SerialWriter and the
+main window) as fast as possible and checks that memory reaches a steady
+state once the buffers are full. The device is synthetic and runs on a fake
+clock, every hour the soak switches between two such ports and sends a
+command a minute. Exits with status 1 if traced memory keeps growing after
+the warm-up.
+
+    QT_QPA_PLATFORM=offscreen python soak_memory.py [--hours 24] [--rate 10]
+"""
+from dataclasses import replace
+import argparse
+import random
+import sys
+import time
+
+import serial
+from PySide6.QtWidgets import QApplication
+
+import main as viewer
+from adaptive_reader import AdaptiveReader
+from memory_guard import MemoryGuard
+from serial_port import SerialPort, SerialPortSettings, ReadingMode
+
+# Small bounds so that they are reached early in the simulated run
+viewer.MAX_PLOT_BYTES = 4 * 1024 * 1024
+viewer.MAX_TEXT_LINES = 10_000
+viewer.MAX_PENDING_TEXT_BYTES = 1024 * 1024
+
+WARM_UP_HOURS = 2
+GROWTH_BUDGET = 2 * 1024 * 1024
+PORT_IDS = ("synthetic-a", "synthetic-b")
+COMMAND_INTERVAL = 60.0
+
+
+class FakeClock:
+    """Simulated seconds, the device may only run up to `until`."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.until = 0.0
+        self.lines = 0
+
+
+def synthetic_line(channels: int) -> bytes:
+    values = ", ".join(f'"ch{c}": {random.randint(0, 1000)}' for c in range(channels))
+    return f"{{{values}}}\n".encode()
+
+
+class SyntheticSerial:
+    """
+    The part of serial.Serial the adaptive reader uses. Every generated line
+    advances the fake clock by 1 / rate, a read with nothing left to
+    generate behaves like a short timeout.
+    """
+    baudrate = 115200
+    bytesize = serial.EIGHTBITS
+    parity = serial.PARITY_NONE
+    stopbits = serial.STOPBITS_ONE
+
+    def __init__(self, clock: FakeClock, rate: int, channels: int) -> None:
+        self.timeout = None
+        self._clock = clock
+        self._rate = rate
+        self._channels = channels
+        self._buffer = bytearray()
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        while len(self._buffer) < size and self._clock.now < self._clock.until:
+            self._buffer += synthetic_line(self._channels)
+            self._clock.now += 1 / self._rate
+            self._clock.lines += 1
+        if not self._buffer:
+            time.sleep(0.001)
+            return b""
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def reset_input_buffer(self) -> None:
+        self._buffer.clear()
+
+
+class SyntheticPort(SerialPort):
+
+    def __init__(self, clock: FakeClock, rate: int, channels: int) -> None:
+        self._device = SyntheticSerial(clock, rate, channels)
+        self._reader = AdaptiveReader(self._device)
+        self.written_bytes = 0
+
+    def read(self) -> bytes:
+        return self._reader.read_line()
+
+    def read_stats(self):
+        return self._reader.stats()
+
+    def write(self, data: bytes | memoryview) -> int:
+        self.written_bytes += len(data)
+        return len(data)
+
+    def apply_settings(self, settings: SerialPortSettings) -> bool:
+        return True
+
+    def reset_input_buffer(self) -> None:
+        self._device.reset_input_buffer()
+
+    def close(self) -> None:
+        pass
+
+
+class SoakWindow(viewer.MainWindow):
+    """Every port the window opens is a synthetic one."""
+    clock: FakeClock
+    rate: int
+    channels: int
+
+    def create_serial_port(self, port_id: str, settings: SerialPortSettings) -> SerialPort:
+        return SyntheticPort(self.clock, self.rate, self.channels)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--rate", type=int, default=10, help="lines per simulated second")
+    parser.add_argument("--channels", type=int, default=4)
+    args = parser.parse_args()
+
+    app = QApplication()
+    clock = FakeClock()
+    SoakWindow.clock = clock
+    SoakWindow.rate = args.rate
+    SoakWindow.channels = args.channels
+    window = SoakWindow()
+    window.show()
+    window.ensure_plot_display()
+
+    window.loaded_settings = replace(
+        window.loaded_settings, reading_mode=ReadingMode.READ_LINE, adaptive_reads=True
+    )
+    guard = MemoryGuard(window.memoryGuard.probes, growth_budget=GROWTH_BUDGET)
+    failed = False
+    received = [0]
+    window.serialThread.new_data.connect(lambda _: received.__setitem__(0, received[0] + 1))
+
+    for hour in range(1, args.hours + 1):
+        window.serialThread.open_port(PORT_IDS[hour % len(PORT_IDS)], window.loaded_settings)
+        next_command = clock.now
+        clock.until = hour * 3600.0
+        while clock.now < clock.until:
+            if clock.now >= next_command:
+                window.serialThread.send_line("status\n")
+                next_command += COMMAND_INTERVAL
+            app.processEvents()
+        # Let the GUI thread catch up with every line the device produced
+        while received[0] < clock.lines:
+            app.processEvents()
+
+        if hour == WARM_UP_HOURS:
+            guard.start()
+        if hour < WARM_UP_HOURS:
+            continue
+
+        warnings = guard.sample()
+        sample = guard.history[-1]
+        print(f"hour {hour:3}: traced {sample.traced_bytes / 1024 / 1024:7.2f} MiB, {sample.sizes}")
+        for warning in warnings:
+            print(f"  warning: {warning}")
+        failed = failed or bool(warnings)
+
+    guard.stop()
+    window.close()
+    print("FAILED: memory is not steady" if failed else "OK: memory is steady")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Publishes the data read from the port to local network subscribers.
+
+Clients connect over TCP or a Unix socket and send one line choosing the
+format, then only receive:
+
+    raw       the bytes exactly as read from the port
+    parsed    one JSON message per batch: {"t": <unix time>, "samples": [...]}
+              with every complete received line that is valid JSON
+
+Each client has its own bounded queue of batches. When a client does not
+keep up its oldest batches are dropped, the reader is never blocked.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
+import asyncio
+import json
+import os
+import threading
+import time
+
+from latency import LineSplitter
+
+# Data read within this window is sent to the clients as one batch
+BATCH_INTERVAL = 0.01
+MAX_QUEUED_BATCHES = 256
+SUBSCRIBE_TIMEOUT = 5.0
+
+
+class StreamFormat(Enum):
+    RAW = "raw"
+    PARSED = "parsed"
+
+
+@dataclass(eq=False)
+class Subscriber:
+    format: StreamFormat
+    queue: asyncio.Queue
+
+
+def parse_address(address: str) -> tuple[str, str | int]:
+    """
+    "unix:/path/to/socket" or "tcp:host:port" (host defaults to 127.0.0.1)
+    into ("unix", path) or (host, port).
+    """
+    kind, _, rest = address.partition(":")
+    match kind:
+        case "unix":
+            if not rest:
+                raise ValueError("Missing socket path")
+            return "unix", rest
+        case "tcp":
+            host, _, port = rest.rpartition(":")
+            return host or "127.0.0.1", int(port)
+    raise ValueError(f"Unknown address type {kind!r}, use unix:<path> or tcp:<host>:<port>")
+
+
+class StreamServer:
+
+    def __init__(self, address: str) -> None:
+        self._host, self._port = parse_address(address)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="StreamServer", daemon=True)
+        self._started = threading.Event()
+        self._start_error: Exception | None = None
+        self._server = None
+        self._subscribers: set[Subscriber] = set()
+        self._dropped_batches = 0
+
+        self._pending: list[bytes] = []
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._stopped = False
+        self._lines = LineSplitter()
+
+    def start(self) -> StreamServer:
+        """Start serving, raises OSError if the address cannot be bound."""
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            raise self._start_error
+        return self
+
+    def stop(self) -> None:
+        with self._pending_lock:
+            self._stopped = True
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def clients(self) -> int:
+        return len(self._subscribers)
+
+    def dropped_batches(self) -> int:
+        """Batches dropped for clients that did not keep up, over all clients."""
+        return self._dropped_batches
+
+    def publish(self, data: bytes) -> None:
+        """
+        Queue data for all subscribers, safe to call from any thread.
+        Does nothing once the server is stopped.
+        """
+        with self._pending_lock:
+            if self._stopped:
+                return
+            self._pending.append(data)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+            # Under the lock, so that stop cannot close the loop in between
+            self._loop.call_soon_threadsafe(self._loop.call_later, BATCH_INTERVAL, self._flush)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            if self._host == "unix":
+                start = asyncio.start_unix_server(self._handle_client, path=self._port)
+            else:
+                start = asyncio.start_server(self._handle_client, self._host, self._port)
+            self._server = self._loop.run_until_complete(start)
+        except OSError as e:
+            with self._pending_lock:
+                self._stopped = True
+            self._start_error = e
+            self._started.set()
+            self._loop.close()
+            return
+
+        self._started.set()
+        self._loop.run_forever()
+
+        self._server.close()
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+        if self._host == "unix":
+            os.unlink(self._port)
+
+    def _flush(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._flush_scheduled = False
+
+        if not self._subscribers:
+            return
+
+        raw = b"".join(pending)
+        lines = self._lines.feed(raw)
+        parsed = None
+
+        for subscriber in self._subscribers:
+            if subscriber.format is StreamFormat.RAW:
+                message = raw
+            else:
+                if parsed is None:
+                    parsed = self._parsed_message(lines)
+                message = parsed
+            if not message:
+                continue
+
+            if subscriber.queue.full():
+                subscriber.queue.get_nowait()
+                self._dropped_batches += 1
+            subscriber.queue.put_nowait(message)
+
+    @staticmethod
+    def _parsed_message(lines: list[bytes]) -> bytes:
+        samples = []
+        for line in lines:
+            try:
+                samples.append(json.loads(line))
+            except ValueError:
+                continue
+        if not samples:
+            return b""
+        return json.dumps({"t": time.time(), "samples": samples}).encode() + b"\n"
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), SUBSCRIBE_TIMEOUT)
+            stream_format = StreamFormat(request.decode(errors="replace").strip())
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            writer.close()
+            return
+
+        subscriber = Subscriber(stream_format, asyncio.Queue(MAX_QUEUED_BATCHES))
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                writer.write(await subscriber.queue.get())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled when the server stops, not re-raised because the
+            # stream protocol logs cancelled handlers as errors
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            writer.close()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import codecs
+
+from serial_port import TextEncoding
+
+
+class TextDecoder:
+    """
+    Turns received chunks into display text.
+
+    Multi-byte characters split across chunks (e.g. when reading byte by
+    byte) are decoded correctly. RAW shows the bytes as hex, one line per
+    received line.
+    """
+
+    def __init__(self, encoding: TextEncoding) -> None:
+        self.encoding = encoding
+        if encoding is not TextEncoding.RAW:
+            self._decoder = codecs.getincrementaldecoder(encoding.value)(errors="replace")
+
+    def decode(self, data: bytes) -> str:
+        if self.encoding is TextEncoding.RAW:
+            return hex_dump(data)
+        return self._decoder.decode(data)
+
+
+def encode_text(text: str, encoding: TextEncoding) -> bytes:
+    """Encode text to send. RAW only affects display, text is sent as UTF-8."""
+    if encoding is TextEncoding.RAW:
+        return text.encode()
+    return text.encode(encoding.value, errors="replace")
+
+
+def hex_dump(data: bytes) -> str:
+    lines = data.split(b"\n")
+    parts = [(line + b"\n").hex(" ") + "\n" for line in lines[:-1]]
+    if lines[-1]:
+        parts.append(lines[-1].hex(" ") + " ")
+    return "".join(parts)
@@ -0,0 +1,158 @@
+"""
+Pages the text of a restored session through the text view.
+
+The view holds a few consecutive pages of the restored text followed by the
+text received since the session was opened. Scrolling to the top of the
+restored pages loads the previous page and scrolling to their bottom loads
+the next one, pages on the other side are dropped to stay within
+max_lines. Pages are always added and dropped whole, so the restored part
+of the view is known exactly even when the text contains lone CRs.
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+
+from PySide6.QtCore import QPoint, Slot
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+from session import SessionText
+
+
+@dataclass
+class Page:
+    start: int  # First and one past the last SessionText line
+    stop: int
+    blocks: int  # Text blocks the page takes in the view
+
+
+class TextPager:
+
+    def __init__(self, view: QPlainTextEdit, text: SessionText, page_lines: int, max_lines: int) -> None:
+        self.text = text
+        self._view = view
+        self._page_lines = page_lines
+        self._max_lines = max_lines
+        self._pages: deque[Page] = deque()
+        self._paging = False
+        # Where the received text continues once every page has been dropped
+        self._first_unloaded = len(text)
+
+        # Trimming is done by trim, Qt would cut pages in half
+        view.setMaximumBlockCount(0)
+        view.clear()
+        start = max(0, len(text) - page_lines)
+        self._insert_page(0, start, len(text))
+        view.moveCursor(QTextCursor.MoveOperation.End)
+        view.verticalScrollBar().valueChanged.connect(self.handle_scroll)
+
+    def detach(self) -> None:
+        """Stop paging, e.g. before another session is restored."""
+        self._view.verticalScrollBar().valueChanged.disconnect(self.handle_scroll)
+        self._view.setMaximumBlockCount(self._max_lines)
+
+    def live_text(self) -> str:
+        """Text received after the session was restored."""
+        cursor = self._cursor_at_block(self._restored_blocks())
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        # Qt separates blocks with U+2029 in selections
+        return cursor.selectedText().replace("\u2029", "\n")
+
+    def trim(self) -> None:
+        """Drop the oldest text while the view has more than max_lines blocks."""
+        excess = self._view.blockCount() - self._max_lines
+        while excess > 0 and self._pages:
+            excess -= self._remove_page(top=True)
+        if excess > 0:
+            self._remove_blocks(0, excess)
+            self._scroll_by(-excess)
+
+    @Slot(int)
+    def handle_scroll(self, value: int) -> None:
+        if self._paging:
+            return
+        self._paging = True
+        try:
+            if value == self._view.verticalScrollBar().minimum():
+                self._page_up()
+            elif self._restored_bottom_visible():
+                self._page_down()
+        finally:
+            self._paging = False
+
+    def _page_up(self) -> None:
+        first = self._pages[0].start if self._pages else self._restored_stop()
+        if first == 0:
+            return
+        start = max(0, first - self._page_lines)
+        # Make room at the bottom first, the new page must not be trimmed
+        while self._view.blockCount() + (first - start) > self._max_lines and self._pages:
+            self._remove_page(top=False)
+        blocks = self._insert_page(0, start, first)
+        self._scroll_by(blocks)
+
+    def _page_down(self) -> None:
+        stop = self._restored_stop()
+        if stop >= len(self.text):
+            return
+        self._insert_page(len(self._pages), stop, min(len(self.text), stop + self._page_lines))
+        self.trim()
+
+    def _restored_stop(self) -> int:
+        """One past the last restored line in the view."""
+        if self._pages:
+            return self._pages[-1].stop
+        return self._first_unloaded
+
+    def _restored_blocks(self) -> int:
+        return sum(page.blocks for page in self._pages)
+
+    def _restored_bottom_visible(self) -> bool:
+        if not self._pages:
+            return False
+        viewport = self._view.viewport()
+        top = self._view.cursorForPosition(QPoint(0, 0)).blockNumber()
+        bottom = self._view.cursorForPosition(QPoint(0, viewport.height() - 1)).blockNumber()
+        return top <= self._restored_blocks() - 1 <= bottom
+
+    def _insert_page(self, index: int, start: int, stop: int) -> int:
+        """Insert lines [start, stop) as the index-th page, returns its blocks."""
+        text = self.text.lines(start, stop)
+        if text and not text.endswith("\n"):
+            text += "\n"  # Partial last line, received text starts on a new one
+
+        blocks_before = sum(page.blocks for page in list(self._pages)[:index])
+        document = self._view.document()
+        count = document.blockCount()
+        self._cursor_at_block(blocks_before).insertText(text)
+        blocks = document.blockCount() - count
+        self._pages.insert(index, Page(start, stop, blocks))
+        return blocks
+
+    def _remove_page(self, top: bool) -> int:
+        page = self._pages.popleft() if top else self._pages.pop()
+        self._first_unloaded = page.stop if top else page.start
+        first_block = 0 if top else self._restored_blocks()
+        self._remove_blocks(first_block, page.blocks)
+        if top:
+            self._scroll_by(-page.blocks)
+        return page.blocks
+
+    def _remove_blocks(self, first: int, count: int) -> None:
+        cursor = self._cursor_at_block(first)
+        end = self._cursor_at_block(first + count)
+        cursor.setPosition(end.position(), QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+
+    def _cursor_at_block(self, number: int) -> QTextCursor:
+        document = self._view.document()
+        cursor = QTextCursor(document)
+        if number >= document.blockCount():
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+        else:
+            cursor.setPosition(document.findBlockByNumber(number).position())
+        return cursor
+
+    def _scroll_by(self, lines: int) -> None:
+        scroll_bar = self._view.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.value() + lines)
@@ -0,0 +1,191 @@
+"""
+A virtual serial device backed by a pseudo-terminal pair.
+
+The application opens the slave end (e.g. /dev/pts/3) with RealSerialPort,
+exactly as it would open hardware, while a background thread drives the
+master end at a configurable rate. Useful for repeatable throughput and
+latency testing without a device attached:
+
+    python virtual_device.py --pattern json --rate 1000 --channels 8
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
+import argparse
+import os
+import random
+import select
+import threading
+import time
+
+VIRTUAL_DEVICE_SUPPORTED = os.name == "posix"
+
+# Data the device holds when the application does not read, like the
+# buffer of a real device; anything beyond that is dropped
+MAX_PENDING_BYTES = 1 << 20
+
+
+class DevicePattern(Enum):
+    JSON = "json"
+    COUNTER = "counter"
+    RANDOM = "random"
+    SILENT = "silent"
+
+
+@dataclass
+class VirtualDeviceSettings:
+    """
+    Attributes:
+        pattern (DevicePattern)
+            What the device sends on its own, SILENT only echoes.
+
+        rate (float)
+            Lines per second.
+
+        channels (int)
+            Number of values per line in the JSON pattern.
+
+        line_length (int)
+            Length of a line in the RANDOM pattern.
+
+        echo (bool)
+            Whether received data is sent back.
+    """
+
+    pattern: DevicePattern = DevicePattern.JSON
+    rate: float = 10.0
+    channels: int = 2
+    line_length: int = 32
+    echo: bool = True
+
+
+class VirtualDevice:
+
+    def __init__(self, settings: VirtualDeviceSettings | None = None) -> None:
+        import pty
+        import tty
+
+        self.settings = VirtualDeviceSettings() if settings is None else settings
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._slave_fd)
+        # A blocking write would wait for a reader that may have stopped
+        os.set_blocking(self._master_fd, False)
+        self.port_name = os.ttyname(self._slave_fd)
+
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.dropped_lines = 0
+        self.dropped_echo_bytes = 0
+        self._line_count = 0
+
+        self._stop_rq = False
+        self._thread = threading.Thread(target=self._run, name="VirtualDevice", daemon=True)
+
+    def start(self) -> VirtualDevice:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop_rq = True
+        if self._thread.is_alive():
+            self._thread.join()
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+
+    def __enter__(self) -> VirtualDevice:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        pending = bytearray()
+        rate = self.settings.rate
+        silent = self.settings.pattern is DevicePattern.SILENT or rate <= 0
+        start = time.monotonic()
+        produced = 0
+
+        while not self._stop_rq:
+            if not silent:
+                due = int(rate * (time.monotonic() - start)) - produced
+                if due > 0:
+                    produced += due
+                    if len(pending) < MAX_PENDING_BYTES:
+                        pending += self._generate(due)
+                    else:
+                        self.dropped_lines += due
+
+            timeout = 0.1 if silent else min(0.1, 1 / rate)
+            writable = [self._master_fd] if pending else []
+            readable, writable, _ = select.select([self._master_fd], writable, [], timeout)
+
+            if readable:
+                try:
+                    data = os.read(self._master_fd, 4096)
+                except OSError:
+                    data = b""  # The slave end is not open at the moment
+                self.received_bytes += len(data)
+                if self.settings.echo:
+                    room = max(0, MAX_PENDING_BYTES - len(pending))
+                    pending += data[:room]
+                    self.dropped_echo_bytes += len(data) - min(room, len(data))
+
+            if writable:
+                try:
+                    written = os.write(self._master_fd, pending)
+                except BlockingIOError:
+                    written = 0
+                del pending[:written]
+                self.sent_bytes += written
+
+    def _generate(self, count: int) -> bytes:
+        lines = []
+        for _ in range(count):
+            match self.settings.pattern:
+                case DevicePattern.JSON:
+                    values = ", ".join(
+                        f'"ch{channel}": {random.randint(0, 100)}'
+                        for channel in range(self.settings.channels)
+                    )
+                    lines.append(f"{{{values}}}\n")
+                case DevicePattern.COUNTER:
+                    lines.append(f"{self._line_count}\n")
+                case DevicePattern.RANDOM:
+                    lines.append("".join(
+                        random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=self.settings.line_length)
+                    ) + "\n")
+            self._line_count += 1
+        return "".join(lines).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pattern", choices=[p.value for p in DevicePattern], default="json")
+    parser.add_argument("--rate", type=float, default=10.0, help="lines per second")
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--line-length", type=int, default=32)
+    parser.add_argument("--no-echo", action="store_true")
+    args = parser.parse_args()
+
+    settings = VirtualDeviceSettings(
+        pattern=DevicePattern(args.pattern),
+        rate=args.rate,
+        channels=args.channels,
+        line_length=args.line_length,
+        echo=not args.no_echo,
+    )
+    with VirtualDevice(settings) as device:
+        print(f"Virtual device on {device.port_name}, Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1.0)
+                print(
+                    f"sent {device.sent_bytes} B, received {device.received_bytes} B, "
+                    f"dropped {device.dropped_lines} lines"
+                )
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()